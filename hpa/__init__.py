@@ -0,0 +1,55 @@
+# ...........................................................................
+#
+# hpa package : the float search of hpa.py, importable without running it
+#
+#   import hpa
+#   hpa.hpa(0.917795181104714, top=5, sm=100, cm=100)
+#   hpa.Matcher(hpa.make_config(enable_pi=True)).match(0.5, top=3)
+#
+# The other modules are imported on first use, so mpmath (hap) and numpy
+# (index) are only loaded when asked for :
+#
+#   hpa.hap, hpa.index, hpa.cache, hpa.server, hpa.bench, hpa.pairs,
+#   hpa.sweep, hpa.watch, hpa.transforms
+#   hpa.Index, hpa.Cache, hpa.Server, hpa.Client, hpa.Pairs, hpa.Sweep,
+#   hpa.Watch, hpa.Transforms
+#
+# python -m hpa runs the hpa.py command line
+# ...........................................................................
+
+import importlib
+
+from .hpa import Approximation, Config, Matcher, Results, Stats, TopK, hpa, iter_approximations, hpa_report, hpa_batch, make_config, parse_interval, main
+
+# name : module
+LAZY = {
+    'hap': 'hap',
+    'index': 'index',
+    'cache': 'cache',
+    'server': 'server',
+    'bench': 'bench',
+    'pairs': 'pairs',
+    'sweep': 'sweep',
+    'watch': 'watch',
+    'transforms': 'transforms',
+    'Index': 'index',
+    'Cache': 'cache',
+    'Server': 'server',
+    'Client': 'server',
+    'Pairs': 'pairs',
+    'Sweep': 'sweep',
+    'Watch': 'watch',
+    'Transforms': 'transforms',
+}
+
+
+def __getattr__(name):
+
+    if name not in LAZY:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    module = importlib.import_module("." + LAZY[name], __name__)
+    if name == LAZY[name]:
+        return module
+
+    return getattr(module, name)
@@ -0,0 +1,14 @@
+# ...........................................................................
+# python -m hpa [options] : the hpa.py command line, from the compiled module
+# ...........................................................................
+
+import sys
+
+from .hpa import main, print_exc
+
+try:
+    main(sys.argv)
+except SystemExit:
+    raise
+except:
+    print_exc()
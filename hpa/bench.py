@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# bench.py (hpa benchmarks) Time the search over a fixed corpus and compare runs
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-18 23:30
+#
+# ...........................................................................
+#
+# 2026-10-18 21:00 first version : 'bench.py run', 'bench.py compare OLD NEW' and 'bench.py curves'
+# 2026-10-18 23:30 'bench.py startup' cold start times against a budget
+# ...........................................................................
+
+import argparse
+import collections
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+try:
+    from .hpa import Matcher, make_config
+except ImportError:
+    from hpa import Matcher, make_config
+
+timer = getattr(time, 'perf_counter', time.time)
+
+
+# ...........................................................................
+# corpus : README examples, pi and a negative value
+# ...........................................................................
+TARGETS = (
+    ('0.334452913060328', 0.334452913060328),
+    ('0.917795181104714', 0.917795181104714),
+    ('pi',                math.pi),
+    ('-1.2247448713915889', -1.2247448713915889),
+)
+
+NDMX = (1000, 10000, 100000, 1000000, 10000000)
+
+# basis sizes : [name, hpa() keyword arguments]
+BASES = (
+    ('ratio',   dict(sm=1, cm=1)),
+    ('default', dict()),
+    ('medium',  dict(sm=100, cm=100, enable_pi=True, enable_e=True)),
+    ('full',    dict(sm=1000, cm=1000, enable_e=True, enable_e2=True, enable_pi=True, enable_pi2=True,
+                     enable_phi=True, enable_tau=True, enable_recip=True)),
+)
+
+
+# cold start : [name, command line, budget in ms over a bare interpreter]
+#
+# python -m hpa runs from the compiled module, so is what pipelines should
+# call; hap.py --help must not import mpmath
+STARTUP = (
+    ('help',     ['-m', 'hpa', '--help'],  50),
+    ('lic',      ['-m', 'hpa', '--lic'],   35),
+    ('query',    ['-m', 'hpa'],            60),
+    ('hap help', ['hpa/hap.py', '--help'], 50),
+)
+
+
+# ...........................................................................
+# numerators the engine may try for one case, to skip cases over budget
+# ...........................................................................
+def bench_cost(matcher, ndmx, engine):
+
+    if engine == 'cf':
+        # a few hundred numerators per multiplier at most
+        return len(matcher.basis) * 256
+
+    return len(matcher.basis) * ndmx
+
+
+# ...........................................................................
+# time one case : best and all times of repeat calls to Matcher.match()
+# ...........................................................................
+def bench_case(name, target, ndmx, basis, kwargs, engine, repeat, top):
+
+    case = {
+        'name': "{} nd {} {} {}".format(name, ndmx, basis, engine),
+        'target': target,
+        'ndmx': ndmx,
+        'basis': basis,
+        'engine': engine,
+    }
+
+    start = timer()
+    matcher = Matcher(make_config(ndmx=ndmx, engine=engine, **kwargs))
+    case['basis_s'] = timer() - start
+    case['multipliers'] = len(matcher.basis)
+
+    # match() takes the magnitude, as hpa_report() does
+    tval = abs(target)
+
+    times = []
+    for i in range(repeat):
+        start = timer()
+        results = matcher.match(tval, top=top)
+        times.append(timer() - start)
+
+    case['times'] = times
+    case['best_s'] = min(times)
+    case['top'] = [[r[3], int(r[4]), r[5]] for r in results]
+
+    return case
+
+
+# ...........................................................................
+# run the corpus, filtered by the lists given, and return the report
+# ...........................................................................
+def bench_run(engines=('scan',), ndmx=NDMX, bases=None, repeat=3, top=10, budget=5e7, log=None):
+
+    report = {
+        'version': 1,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'cases': [],
+        'skipped': [],
+    }
+
+    for basis, kwargs in BASES:
+        if bases and basis not in bases:
+            continue
+        for engine in engines:
+            for nd in ndmx:
+                matcher = Matcher(make_config(ndmx=nd, engine=engine, **kwargs))
+                if bench_cost(matcher, nd, engine) > budget:
+                    for name, target in TARGETS:
+                        report['skipped'].append("{} nd {} {} {}".format(name, nd, basis, engine))
+                    continue
+
+                for name, target in TARGETS:
+                    case = bench_case(name, target, nd, basis, kwargs, engine, repeat, top)
+                    report['cases'].append(case)
+                    if log is not None:
+                        log.write("{:<45} {:>6} multipliers  {:10.4f} s\n".format(
+                            case['name'], case['multipliers'], case['best_s']))
+                        log.flush()
+
+    return report
+
+
+# ...........................................................................
+# compare two reports : print each case and return the regressions
+#
+# a case regresses when its best time grows by more than tolerance (and by
+# more than min_s, below which timings are noise) or its results change
+# ...........................................................................
+def bench_compare(old, new, tolerance=0.10, min_s=0.002, out=None):
+
+    if out is None:
+        out = sys.stdout
+
+    before = dict((c['name'], c) for c in old['cases'])
+    regressions = []
+
+    out.write("{:<45}{:>12}{:>12}{:>9}\n\n".format(" case", "old s", "new s", "ratio"))
+
+    for case in new['cases']:
+        name = case['name']
+        if name not in before:
+            out.write(" {:<44}{:>12}{:>12.4f}{:>9}\n".format(name, "-", case['best_s'], "new"))
+            continue
+
+        was = before[name]
+        ratio = case['best_s'] / max(was['best_s'], 1e-9)
+
+        flags = []
+        if ratio > 1 + tolerance and case['best_s'] - was['best_s'] > min_s:
+            flags.append("slower")
+        if case['top'] != was['top']:
+            flags.append("results changed")
+        if flags:
+            regressions.append((name, flags))
+
+        out.write(" {:<44}{:>12.4f}{:>12.4f}{:>9.2f}  {}\n".format(
+            name, was['best_s'], case['best_s'], ratio, ", ".join(flags)))
+
+    return regressions
+
+
+# ...........................................................................
+# cold start : median wall time of each STARTUP command over repeat runs,
+# less that of "python -c pass", against its budget times slack
+# ...........................................................................
+def bench_startup(repeat=15, slack=1.0, log=None):
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def median(argv):
+        times = []
+        for i in range(repeat):
+            start = timer()
+            subprocess.call([sys.executable] + argv, cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            times.append(timer() - start)
+        times.sort()
+        return 1000 * times[len(times) // 2]
+
+    bare = median(['-c', 'pass'])
+    report = {'python_ms': bare, 'startup': []}
+
+    if log is not None and os.environ.get('PYTHONDONTWRITEBYTECODE'):
+        log.write("PYTHONDONTWRITEBYTECODE is set, modules are compiled on every run\n")
+
+    for name, argv, budget in STARTUP:
+        ms = median(argv)
+        case = {
+            'name': name,
+            'argv': argv,
+            'ms': ms,
+            'over_ms': ms - bare,
+            'budget_ms': budget * slack,
+            'ok': ms - bare <= budget * slack,
+        }
+        report['startup'].append(case)
+        if log is not None:
+            log.write("{:<12} {:8.1f} ms  {:8.1f} over python  budget {:6.1f}  {}\n".format(
+                name, ms, ms - bare, budget * slack, "ok" if case['ok'] else "OVER"))
+
+    return report
+
+
+# ...........................................................................
+# scaling curves : mean best time over the targets for each limit, by basis
+# and engine, with the slope of log(time) against log(ndmx) between limits
+# ...........................................................................
+def bench_curves(report, out=None):
+
+    if out is None:
+        out = sys.stdout
+
+    curves = collections.OrderedDict()
+    sizes = {}
+    for case in report['cases']:
+        key = (case['basis'], case['engine'])
+        curves.setdefault(key, collections.OrderedDict()).setdefault(case['ndmx'], []).append(case['best_s'])
+        sizes[key] = case['multipliers']
+
+    for (basis, engine), points in curves.items():
+        out.write("\n {} {} ({} multipliers)\n\n".format(basis, engine, sizes[(basis, engine)]))
+
+        last = None
+        for ndmx, times in points.items():
+            mean = sum(times) / len(times)
+            if last is None:
+                slope = ""
+            else:
+                slope = "{:6.2f}".format(math.log(mean / last[1]) / math.log(float(ndmx) / last[0]))
+            out.write(" {:>12} {:12.4f} s  {}\n".format(ndmx, mean, slope))
+            last = (ndmx, mean)
+
+
+# ...........................................................................
+def main(argv):
+
+    parser = argparse.ArgumentParser(description='hpa benchmarks')
+    commands = parser.add_subparsers(dest='command')
+
+    run = commands.add_parser('run', help='time the corpus and write JSON')
+    run.add_argument('-o', '--out',     action='store', default='-', help='JSON output file (- for stdout)')
+    run.add_argument('-g', '--engine',  action='append', choices=['scan', 'cf', 'numpy'], help='engines to time (repeat for more, default scan)')
+    run.add_argument('-n', '--ndmx',    action='append', type=float, help='numerator/denominator limits (repeat for more, default 1e3 to 1e7)')
+    run.add_argument('-b', '--basis',   action='append', choices=[b[0] for b in BASES], help='basis sizes (repeat for more, default all)')
+    run.add_argument('-r', '--repeat',  action='store', type=int, default=3, help='calls per case, the best is kept')
+    run.add_argument('-x', '--top',     action='store', type=int, default=10, help='number of approximations')
+    run.add_argument('--budget',        action='store', type=float, default=5e7, help='skip cases that may try more numerators')
+    run.add_argument('-q', '--quiet',   action='store_true', default=False, help='no progress on stderr')
+
+    compare = commands.add_parser('compare', help='compare two JSON runs, exit 1 on regressions')
+    compare.add_argument('old', help='JSON of the baseline run')
+    compare.add_argument('new', help='JSON of the run to check')
+    compare.add_argument('--tolerance', action='store', type=float, default=0.10, help='allowed slow down, 0.10 is 10%%')
+    compare.add_argument('--min-s',     action='store', type=float, default=0.002, help='ignore changes smaller than this many seconds')
+
+    curves = commands.add_parser('curves', help='time against limit for each basis and engine of a JSON run')
+    curves.add_argument('report', help='JSON of a run')
+
+    startup = commands.add_parser('startup', help='cold start times against a budget, exit 1 if over')
+    startup.add_argument('-r', '--repeat', action='store', type=int, default=15, help='runs of each command, the median is kept')
+    startup.add_argument('--slack',        action='store', type=float, default=1.0, help='scale the budgets, for slow machines')
+    startup.add_argument('-o', '--out',    action='store', default=None, help='JSON output file')
+
+    args = parser.parse_args(argv[1:])
+
+    if args.command == 'run':
+        report = bench_run(
+            engines=args.engine or ['scan'],
+            ndmx=[int(n) for n in args.ndmx] if args.ndmx else NDMX,
+            bases=args.basis,
+            repeat=args.repeat,
+            top=args.top,
+            budget=args.budget,
+            log=None if args.quiet else sys.stderr)
+
+        text = json.dumps(report, indent=1)
+        if args.out == '-':
+            print(text)
+        else:
+            with open(args.out, 'w') as f:
+                f.write(text + "\n")
+        return 0
+
+    if args.command == 'compare':
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+
+        regressions = bench_compare(old, new, args.tolerance, args.min_s)
+
+        print("\n {} regressions".format(len(regressions)))
+        return 1 if regressions else 0
+
+    if args.command == 'startup':
+        report = bench_startup(args.repeat, args.slack, sys.stdout)
+        if args.out is not None:
+            with open(args.out, 'w') as f:
+                f.write(json.dumps(report, indent=1) + "\n")
+        return 0 if all(c['ok'] for c in report['startup']) else 1
+
+    if args.command == 'curves':
+        with open(args.report) as f:
+            bench_curves(json.load(f))
+        return 0
+
+    parser.print_usage()
+    return 2
+
+# ...........................................................................
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
+
+# ...........................................................................
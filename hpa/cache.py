@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# cache.py (hpa result cache) Remember results by target and settings, in memory and on disk
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-19 13:00
+#
+# ...........................................................................
+#
+# 2026-10-18 17:00 first version : in process LRU and sqlite store, '-k FILE'
+# 2026-10-18 21:30 match() takes a Stats
+# 2026-10-18 22:30 lookup() and store() for the server
+# 2026-10-19 10:00 match() takes a deadline, partial results are not cached
+# 2026-10-19 11:00 cache_settings of the matcher, for Pairs
+# 2026-10-19 13:00 results are Approximation
+# ...........................................................................
+
+import collections
+import json
+import threading
+import time
+
+try:
+    from .hpa import Approximation
+except ImportError:
+    from hpa import Approximation
+
+
+# ...........................................................................
+# Cache : results of a Matcher (or Index) remembered by target and settings
+#
+# The key is the exact bits of the target, the settings that change the
+# results (the Config without the engine, as every engine gives the same
+# results) and the number of results asked for.  Recently used results are
+# kept in memory, and in an sqlite file if a path is given, which drops the
+# least recently used results once it grows past max_bytes.
+#
+# Has the match(), settings and equivalents() of a Matcher so it can be used
+# in its place.
+# ...........................................................................
+class Cache(object):
+
+    def __init__(self, matcher, path=None, maxsize=1024, max_bytes=64 << 20):
+
+        self.matcher = matcher
+        self.settings_short = matcher.settings_short
+        self.settings_verbose = matcher.settings_verbose
+
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.memory = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        config = getattr(matcher, 'config', None)
+        if hasattr(matcher, 'cache_settings'):
+            # searches of their own, as Pairs
+            settings = matcher.cache_settings
+        elif config is not None:
+            settings = config._replace(engine=None)
+        else:
+            # an Index is fixed by its file
+            settings = ('index', matcher.path)
+        self.settings = json.dumps(list(settings))
+
+        self.db = None
+        if path is not None:
+            import sqlite3
+            self.db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS results"
+                            " (key TEXT PRIMARY KEY, results TEXT, size INTEGER, used REAL)")
+            self.db.commit()
+
+    # .......................................................................
+    # as Matcher.match(), searching only when the results are not cached
+    #
+    # partial results of a search with a deadline are not cached
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        results = self.lookup(target, top)
+        if results is not None:
+            return results
+
+        if deadline is None:
+            results = self.matcher.match(target, jobs, pool, top, stats)
+        else:
+            results = self.matcher.match(target, jobs, pool, top, stats, deadline)
+
+        if not getattr(results, 'partial', False):
+            self.store(target, top, results)
+
+        return results
+
+    # .......................................................................
+    # cached results for target and top, or None (counted as a miss)
+    # .......................................................................
+    def lookup(self, target, top):
+
+        key = self.key(target, top)
+
+        with self.lock:
+            results = self.memory.pop(key, None)
+            if results is not None:
+                self.memory[key] = results
+                self.hits += 1
+                return list(results)
+
+            if self.db is not None:
+                row = self.db.execute("SELECT results FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self.db.execute("UPDATE results SET used = ? WHERE key = ?", (time.time(), key))
+                    self.db.commit()
+                    results = [Approximation.from_row(r) for r in json.loads(row[0])]
+                    self.remember(key, results)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return list(results)
+
+            self.misses += 1
+
+        return None
+
+    # .......................................................................
+    # cache the results of a search
+    # .......................................................................
+    def store(self, target, top, results):
+
+        key = self.key(target, top)
+
+        with self.lock:
+            self.remember(key, results)
+
+            if self.db is not None:
+                text = json.dumps([list(r) for r in results])
+                self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                (key, text, len(text), time.time()))
+                self.evict()
+                self.db.commit()
+
+    # .......................................................................
+    def key(self, target, top):
+
+        return "{} {} {}".format(float(target).hex(), top, self.settings)
+
+    # .......................................................................
+    # keep in memory, dropping the least recently used past maxsize
+    # .......................................................................
+    def remember(self, key, results):
+
+        self.memory[key] = tuple(results)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    # .......................................................................
+    # drop the least recently used results on disk past max_bytes
+    # .......................................................................
+    def evict(self):
+
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+        while total > self.max_bytes:
+            row = self.db.execute("SELECT key, size FROM results ORDER BY used LIMIT 1").fetchone()
+            if row is None:
+                break
+            self.db.execute("DELETE FROM results WHERE key = ?", (row[0],))
+            total -= row[1]
+
+    # .......................................................................
+    def equivalents(self, result):
+
+        return self.matcher.equivalents(result)
+
+    # .......................................................................
+    # hit and miss counts
+    # .......................................................................
+    def stats(self):
+
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses}
+
+    # .......................................................................
+    def close(self):
+
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+# ...........................................................................
@@ -22,181 +22,466 @@
 # Arbitrary precision requires all floating point variables to be instances of mpf()
 # ...........................................................................
 #
-# 2019-03-14 14:30
+# 2026-10-19 12:00
 #
 # ...........................................................................
 #
 # 2019-03-14 14:30 First version (Pi day)
 # 2019-12-29 18:40 '-T time option'
 # 2020-01-01 13:00 executable python3 for mpmath
+# 2026-10-18 18:00 float search of hpa.py to shortlist, then mpmath at '-A' digits to rank, '-m'
+# 2026-10-18 19:00 '-g int' integer engine searching at full precision
+# 2026-10-18 20:00 '-R' integer relations by lattice reduction
+# 2026-10-18 23:30 mpmath imported when needed, no mp.quad at start up
+# 2026-10-19 12:00 '--trig' multipliers evaluated at full precision
 # ...........................................................................
 
-import traceback
 import math
-import argparse
 import os
 import sys
 import time
-from mpmath import mp
+import fractions
 
-# for python2:
-from fractions import gcd
+# the float search, mpmath is imported by the functions that use it so
+# --help and the like do not wait for it
+try:
+    from .hpa import Matcher, make_config, print_exc
+except ImportError:
+    from hpa import Matcher, make_config, print_exc
 
 # ...........................................................................
 # high precision approximation
 #
-# return sorted list of triplets : [text of approximation, error, actual value]
+# two stages : the float search of hpa.py shortlists the top candidates (plus
+# a margin), then only those are evaluated with mpmath at the set precision
+# and ranked again
+#
+# return sorted list of tuples :
+#   [text of approximation, error, actual value, numerator, denominator, multiplier text]
+# with error and value as mpf
 # ...........................................................................
-def hpa(target, **kwargs):
+def hpa(target, top=10, **kwargs):
 
-    global results, settings_short, settings_verbose, PY3
+    global settings_short, settings_verbose
 
-    PY3 = sys.version_info[0] == 3
+    prec   = kwargs.get('prec', 100)
+    margin = kwargs.get('margin', 10)
 
-    results = []
+    matcher = Matcher(make_config(**kwargs))
+    forms = dict((text, form) for f, text, form in matcher.basis)
 
-    settings_short = ""
-    settings_verbose = []
+    settings_short = matcher.settings_short + " prec {}".format(prec)
+    settings_verbose = matcher.settings_verbose + ["{:<35} : {}".format("precision digits", prec)]
 
-    ndmax   = kwargs['ndmx']
-    sm      = kwargs['sm']
-    cm      = kwargs['cm']
-    thresh  = kwargs['thr']
-    recip   = kwargs['enable_recip']
+    if kwargs.get('engine') == 'int':
+        shortlist = hap_search_int(target, matcher, prec, top + margin)
+        return hap_verify(target, shortlist, forms, top, prec)
 
-    hpa_p(target, ndmax, thresh, 1.0, "ratio")
-    settings_short = "settings: nd {} sm {} cm {} thr {}".format(ndmax, sm, cm, thresh)
+    tval = float(target)
 
-    settings_verbose.append("{:<35} : {}".format("numerator/denominator limit", ndmax))
+    # float error of a candidate, from the rounding of the multiplier,
+    # product, quotient and difference
+    slack = 8 * sys.float_info.epsilon * max(abs(tval), 1.0)
 
-    settings_verbose.append("{:<35} : {}".format("square root max", sm))
+    want = top + margin
+    while True:
+        shortlist = matcher.match(tval, top=want)
+        results = hap_verify(target, shortlist, forms, top, prec)
 
-    settings_verbose.append("{:<35} : {}".format("cube root max", cm))
+        # every candidate that could beat the top-th after rounding was
+        # screened, or there are no more candidates
+        if len(shortlist) < want or len(results) < top:
+            break
+        if abs(shortlist[-1][1]) > abs(results[top - 1][1]) + slack:
+            break
+        want *= 2
 
-    settings_verbose.append("{:<35} : {}".format("threshold", thresh))
+    return results
 
-    if recip:
-        settings_short = settings_short + " recip"
-        settings_verbose.append("{:<35} : {}".format("matching reciprocals", True))
 
-    if kwargs['enable_e']:
-        hpa_pr(target, ndmax, thresh, math.e, "e", recip)
-        settings_short = settings_short + " e"
-        settings_verbose.append("{:<35} : {}".format("matching e", True))
+# ...........................................................................
+# integer engine : the whole search at full precision, no float screen
+#
+# The target and every multiplier are scaled by 2^bits and rounded to
+# integers, then searched with integer arithmetic only; mpf values are made
+# for the shortlist alone.  Returns the top best as an unranked shortlist of
+# result tuples for hap_verify().
+# ...........................................................................
+def hap_search_int(target, matcher, prec, top):
 
-    if kwargs['enable_pi']:
-        hpa_pr(target, ndmax, thresh, math.pi, "Pi", recip)
-        settings_short = settings_short + " pi"
-        settings_verbose.append("{:<35} : {}".format("matching pi", True))
+    from mpmath import mp
 
-    if kwargs['enable_phi']:
-        phi = (1 + 5 ** 0.5) / 2
-        hpa_pr(target, ndmax, thresh, phi, "Phi", recip)
-        settings_short = settings_short + " phi"
-        settings_verbose.append("{:<35} : {}".format("matching phi", True))
+    config = matcher.config
 
-    if kwargs['enable_tau']:
-        tau = math.pi * 2.0
-        hpa_pr(target, ndmax, thresh, tau, "Tau", recip)
-        settings_short = settings_short + " tau"
-        settings_verbose.append("{:<35} : {}".format("matching tau", True))
+    # prec digits, and enough more that n * f / d is still good to prec
+    # digits with n and d up to the limit
+    bits = int(prec * 3.33) + 2 * config.ndmx.bit_length() + 16
 
-    for s in range (2,sm+1):
-        a = math.sqrt(s)
-        b = int(math.sqrt(s))
-        # skip squares 4, 9, 16 etc
-        if a > b:
-            hpa_pr(target, ndmax, thresh, math.sqrt(s), "sqrt({})".format(s), recip)
+    with mp.workprec(bits + 16):
+        T = int(mp.nint(mp.ldexp(mp.mpf(target), bits)))
+        scaled = [int(mp.nint(mp.ldexp(hap_value(1, 1, form), bits))) for f, text, form in matcher.basis]
 
-    for s in range (2,cm+1):
-        a = math.pow(s,1.0/3)
-        b = int(math.pow(s,1.0/3))
-        # skip cubes 8, 27 etc
-        if a > b:
-            hpa_pr(target, ndmax, thresh, math.pow(s,1.0/3), "cbrt({})".format(s), recip)
+    rows = []
+    for (f, fp, form), F in zip(matcher.basis, scaled):
+        for nb, db, num in hap_p_int(T, F, bits, config.ndmx, config.thr):
+            rows.append((fractions.Fraction(abs(num), db), nb, db, fp))
 
-    results = sorted(results, key=takeSecond, reverse=False)
+    rows.sort(key=lambda r: r[0])
 
-    return results
+    return [("({} / {})  {}".format(nb, db, fp), None, None, nb, db, fp) for e, nb, db, fp in rows[:top]]
+
+
+# ...........................................................................
+# the continued fraction engine of hpa.py (hpa_p_cf) on scaled integers
+#
+# T and F are the target and multiplier times 2^bits, the error of n / d is
+# (n * F - d * T) / d in units of 2^-bits, kept as the exact pair [num, d]
+# and compared by cross multiplying
+#
+# return list of triplets : [numerator, denominator, error numerator] for
+# each improvement in lowest terms
+# ...........................................................................
+def hap_p_int(T, F, bits, numdenmax, thresh):
+
+    found = []
+    thresh = fractions.Fraction(thresh) * (1 << bits)
+
+    def below(num, den, best):
+        # |num| / den < best, best is [num, den] with num >= 0
+        return abs(num) * best[1] < best[0] * den
+
+    def reached(m):
+        if m < 2:
+            return True
+        return max(m - 1, ((m - 1) * F) // T + 1) < numdenmax
+
+    def improves(m, best):
+        dm = (m * F) // T
+        if dm > 0 and below(m * F - dm * T, dm, best):
+            return True
+        return below(m * F - (dm + 1) * T, dm + 1, best)
+
+    def visit(n, best):
+        d = (n * F) // T
+
+        if d > 0:
+            num = n * F - d * T
+            if below(num, d, best):
+                best = (abs(num), d)
+                if math.gcd(n, d) < 2:
+                    found.append((n, d, num))
+
+        d += 1
+
+        num = n * F - d * T
+        if below(num, d, best):
+            best = (abs(num), d)
+            if math.gcd(n, d) < 2:
+                found.append((n, d, num))
+
+        return best
+
+    def above(best):
+        # best > thresh
+        return best[0] * thresh.denominator > thresh.numerator * best[1]
+
+    # 1e6 as for hpa_p()
+    best = visit(1, (10 ** 6 << bits, 1))
+
+    # convergents of T / F, with r = x / y
+    p0, p1 = 0, 1
+    x, y = T, F
+
+    while above(best):
+        a = x // y
+
+        if p1 > 0 and a > 0:
+            lo = 1
+            hi = a
+            if not reached(p0 + hi * p1):
+                top = 0
+                while lo <= hi:
+                    mid = (lo + hi) // 2
+                    if reached(p0 + mid * p1):
+                        top = mid
+                        lo = mid + 1
+                    else:
+                        hi = mid - 1
+                lo = 1
+                hi = top
+
+            j = lo
+            while j <= hi and above(best):
+                if not improves(p0 + j * p1, best):
+                    if not improves(p0 + hi * p1, best):
+                        break
+                    lo = j + 1
+                    top = hi
+                    while lo < top:
+                        mid = (lo + top) // 2
+                        if improves(p0 + mid * p1, best):
+                            top = mid
+                        else:
+                            lo = mid + 1
+                    j = top
+                best = visit(p0 + j * p1, best)
+                j += 1
+
+            if hi < a:
+                break
+
+        p0, p1 = p1, a * p1 + p0
+
+        if x == a * y:
+            break
+
+        x, y = y, x - a * y
+
+    return found
 
 
 # ...........................................................................
-# call with and without reciprocal
+# evaluate the shortlist at prec digits and sort by error
+#
+# precision is doubled (up to four times prec) while the errors of
+# neighbouring results in the top are too close to be told apart
 # ...........................................................................
-def hpa_pr(tval, numdenmax, thresh, multiplier, rp, recip):
+def hap_verify(target, shortlist, forms, top, prec):
 
-    hpa_p(tval, numdenmax, thresh, multiplier, "* " + rp)
+    from mpmath import mp
 
-    if recip:
-        hpa_p(tval, numdenmax, thresh, 1.0/multiplier, "* recip " + rp)
+    dps = prec
 
+    while True:
+        with mp.workdps(dps):
+            tval = mp.mpf(target)
+            results = []
+            for pretty, t, value, nb, db, fp in shortlist:
+                v = hap_value(nb, db, forms[fp])
+                results.append((pretty, v - tval, v, nb, db, fp))
 
-# ...........................................................................
-def hpa_p(tval, numdenmax, thresh, fixed, fixed_p):
+            results.sort(key=takeSecond)
 
-    global n, d, t, nb, db, best, results, f, fp
+            # smallest difference the errors can hold at this precision
+            resolution = mp.mpf(10) ** (5 - dps) * max(abs(tval), 1)
+            close = False
+            for a, b in zip(results[:top], results[1:top + 1]):
+                if abs(b[1]) - abs(a[1]) < resolution:
+                    close = True
+                    break
 
-    best = 1e6
-    f = fixed
-    fp = fixed_p
-    n = 0
-    d = 0
-    t = 0.0
-    nb = 0
-    db = 0
+        if not close or dps >= 4 * prec:
+            break
+        dps = min(2 * dps, 4 * prec)
 
-    try:
-        while (max(n,d) < numdenmax) & (best > thresh):
-            n += 1
-            d = math.floor( (n * f)/ tval )
-            try:
-                t = ((n * f)/ d) - tval
-            except:
-                # t = math.inf
-                t = float("inf")
-            test_ratio()
+    # report at the asked precision
+    with mp.workdps(prec):
+        return [(r[0], +r[1], +r[2]) + r[3:] for r in results]
 
-            d += 1
 
-            t = ((n * f) / d) - tval
-            test_ratio()
+# ...........................................................................
+# (nb / db) * multiplier from the form of the multiplier, at the current
+# precision
+#
+# form is [coefficient, atoms] as for root_form() in hpa.py
+# ...........................................................................
+def hap_value(nb, db, form):
 
-    except:
-        traceback.print_exc()
+    from mpmath import mp
+
+    coef, atoms = form
+    coef = fractions.Fraction(coef) * nb / db
+
+    value = mp.mpf(coef.numerator) / coef.denominator
+
+    for name, e in atoms:
+        if name.isdigit():
+            e = fractions.Fraction(e)
+            value *= mp.root(int(name), e.denominator) ** e.numerator
+        elif "pi/" in name:
+            # trig atoms are named by their text, as cos(2pi/7)
+            k, n = name[4:-1].split("pi/")
+            value *= getattr(mp, name[:3])(mp.pi * int(k or 1) / int(n)) ** e
+        else:
+            # e, pi and phi at the current precision
+            value *= getattr(mp, name) ** e
+
+    return value
 
 
 # ...........................................................................
-def test_ratio():
+# integer relations : target as a sum of small multiples of 1 and the basis
+#
+# One lattice reduction (LLL) of the rows [identity | 10^k * x] for
+#   x = (target, 1, multipliers)
+# gives short integer vectors c with c . x near zero; those with a non zero
+# target coefficient are relations
+#   target = -(c1 + c2 * m2 + ...) / c0
+# The canonical basis is used as rational multiples of one multiplier only
+# add trivial relations.
+#
+# return list of tuples, smallest coefficients first :
+#   [text of relation, error, value, coefficients, height]
+# ...........................................................................
+def hap_relation(target, **kwargs):
+
+    from mpmath import mp
+
+    global settings_short, settings_verbose
+
+    prec = kwargs.get('prec', 100)
+
+    config = make_config(**kwargs)._replace(canonical=True)
+    matcher = Matcher(config)
 
-    global n, d, t, nb, db, best, results, f, fp, PY3
+    settings_short = matcher.settings_short + " prec {} relation".format(prec)
+    settings_verbose = matcher.settings_verbose + ["{:<35} : {}".format("precision digits", prec),
+                                                   "{:<35} : {}".format("integer relations", True)]
 
-    if ( abs(t) < best ):
-        nb = n
-        db = d
-        best = abs(t)
+    basis = [b for b in matcher.basis if b[2][1]]
+    texts = [b[1][2:] for b in basis]
 
-        # greatest common divisor used to avoid redundant ratios
-        # print("{} / {}  best {}  value {} gcd {}".format(nb, db, best, nb/db, math.gcd(nb,db)))
-        # if math.gcd(nb,db) < 2: # for python2 : if gcd(nb, db) < 2:
+    with mp.workdps(prec):
+        x = [mp.mpf(target), mp.mpf(1)] + [hap_value(1, 1, b[2]) for b in basis]
+
+        # keep digits back from the target's precision so that chance
+        # near relations stay well above the rounding of real ones
+        scale = mp.mpf(10) ** max(prec - 20, prec // 2)
+        rows = []
+        for i, v in enumerate(x):
+            row = [0] * len(x)
+            row[i] = 1
+            rows.append(row + [int(mp.nint(scale * v))])
+
+        reduced = hap_lll(rows)
+
+        ulp = mp.mpf(10) ** (2 - prec)
+
+        results = []
+        for row in reduced:
+            c = row[:len(x)]
+            if c[0] == 0:
+                continue
+            if c[0] < 0:
+                c = [-a for a in c]
+
+            height = max(abs(a) for a in c)
+            if height > config.ndmx:
+                continue
+
+            # a real relation is zero to the rounding of its terms
+            residual = mp.fsum(a * v for a, v in zip(c, x))
+            if abs(residual) > ulp * mp.fsum(abs(a * v) for a, v in zip(c, x)):
+                continue
+
+            value = -mp.fsum(a * v for a, v in zip(c[1:], x[1:])) / c[0]
+
+            results.append((hap_relation_text(c, texts), value - x[0], value, tuple(c), height))
+
+    results.sort(key=lambda r: (r[4], abs(r[1])))
+
+    return results
 
-        gcd_ok = False
 
-        if PY3:
-            if math.gcd(nb,db) < 2:
-                gcd_ok =  True
+# ...........................................................................
+# "(a + b sqrt(2) - c Pi) / d" for the relation c
+# ...........................................................................
+def hap_relation_text(c, texts):
+
+    terms = []
+    for a, text in zip([-a for a in c[1:]], ["1"] + texts):
+        if a == 0:
+            continue
+        if text == "1":
+            term = "{}".format(abs(a))
+        elif abs(a) == 1:
+            term = text
         else:
-            if gcd(nb, db) < 2:
-                gcd_ok = True
+            term = "{} {}".format(abs(a), text)
+        if terms:
+            terms.append("- " if a < 0 else "+ ")
+        elif a < 0:
+            terms.append("-")
+        terms.append(term + " ")
+
+    text = "".join(terms).strip() or "0"
+
+    if c[0] == 1:
+        return text
+    if len(terms) > 1:
+        text = "({})".format(text)
+    return "{} / {}".format(text, c[0])
+
+
+# ...........................................................................
+# LLL reduction (delta 3/4) of integer row vectors, in exact integer
+# arithmetic (Cohen, A Course in Computational Algebraic Number Theory,
+# algorithm 2.6.7)
+#
+# the rows must be linearly independent, returns the reduced rows
+# ...........................................................................
+def hap_lll(rows):
+
+    b = [None] + [list(r) for r in rows]
+    n = len(rows)
+
+    def dot(u, v):
+        return sum(p * q for p, q in zip(u, v))
+
+    # d[i] and lam[k][j] as in the book, 1 based
+    d = [0] * (n + 1)
+    lam = [[0] * (n + 1) for i in range(n + 1)]
+
+    def red(k, l):
+        if 2 * abs(lam[k][l]) > d[l]:
+            q = (2 * lam[k][l] + d[l]) // (2 * d[l])
+            b[k] = [p - q * r for p, r in zip(b[k], b[l])]
+            lam[k][l] -= q * d[l]
+            for i in range(1, l):
+                lam[k][i] -= q * lam[l][i]
+
+    def swap(k):
+        b[k], b[k - 1] = b[k - 1], b[k]
+        for j in range(1, k - 1):
+            lam[k][j], lam[k - 1][j] = lam[k - 1][j], lam[k][j]
+        m = lam[k][k - 1]
+        B = (d[k - 2] * d[k] + m * m) // d[k - 1]
+        for i in range(k + 1, kmax + 1):
+            t = lam[i][k]
+            lam[i][k] = (d[k] * lam[i][k - 1] - m * t) // d[k - 1]
+            lam[i][k - 1] = (B * t + m * lam[i][k]) // d[k]
+        d[k - 1] = B
+
+    d[0] = 1
+    d[1] = dot(b[1], b[1])
+    k = 2
+    kmax = 1
+
+    while k <= n:
+        if k > kmax:
+            kmax = k
+            for j in range(1, k + 1):
+                u = dot(b[k], b[j])
+                for i in range(1, j):
+                    u = (d[i] * u - lam[k][i] * lam[j][i]) // d[i - 1]
+                if j < k:
+                    lam[k][j] = u
+                else:
+                    d[k] = u
+
+        while True:
+            red(k, k - 1)
+            if 4 * d[k] * d[k - 2] < 3 * d[k - 1] ** 2 - 4 * lam[k][k - 1] ** 2:
+                swap(k)
+                k = max(2, k - 1)
+            else:
+                break
 
-        if gcd_ok:
-            # :0.0f needed for python2 compatibility
-            pretty = "({} / {:.0f})  {}".format(nb, db, fp)
-            # print("{} / {}  pretty {}".format(nb, db, pretty))
+        for l in range(k - 2, 0, -1):
+            red(k, l)
+        k += 1
 
-            try:
-                results.append ((pretty, t, (nb * f)/ db) )
-            except:
-                pass
+    return b[1:]
 
 
 # ...........................................................................
@@ -236,6 +521,8 @@ def takeSecond(elem):
 # ...........................................................................
 def hpa_report(target, top_n, **kwargs):
 
+    from mpmath import mp
+
     global settings_short, settings_verbose
 
     # ...........................................................................
@@ -250,7 +537,7 @@ def hpa_report(target, top_n, **kwargs):
         tval = target
         sign = " "
 
-    results = hpa(tval, **kwargs)
+    results = hpa(tval, top_n, **kwargs)
 
     try:
         if kwargs['settings']:
@@ -263,7 +550,7 @@ def hpa_report(target, top_n, **kwargs):
                 print(" {:<35}".format(s))
 
         print("\n top {} best approximations to {}\n".format(top_n, target))
-        print("{:<35}{:21}{:15}\n".format(" approximation","  error", "value"))
+        print("{:<35}{:26}{:15}\n".format(" approximation","  error", "value"))
 
         try:
             for x in range (0, top_n):
@@ -274,12 +561,54 @@ def hpa_report(target, top_n, **kwargs):
                 else:
                     errsign = " "
 
-                print("{}{:<35}{}{:.15f}\t{:.15f}".format(sign, s[0], errsign, abs(s[1]), s[2]))
+                # error to 15 significant digits, value to the full precision
+                print("{}{:<35}{}{:<25}{}".format(sign, s[0], errsign, mp.nstr(abs(s[1]), 15), mp.nstr(s[2], mp.dps)))
         except:
             pass
 
     except:
-        traceback.print_exc()
+        print_exc()
+
+
+# ...........................................................................
+# call hap_relation and report the relations found
+# ...........................................................................
+def hap_relation_report(target, top_n, **kwargs):
+
+    from mpmath import mp
+
+    global settings_short, settings_verbose
+
+    results = hap_relation(target, **kwargs)
+
+    try:
+        if kwargs['settings']:
+            print("")
+            print(" {:<35}".format(settings_short))
+
+        if kwargs['verbose']:
+            print("")
+            for s in settings_verbose:
+                print(" {:<35}".format(s))
+
+        print("\n top {} integer relations for {}\n".format(top_n, target))
+
+        if not results:
+            print(" none with coefficients up to {}".format(kwargs['ndmx']))
+            return
+
+        print("{:<35}{:26}{:15}\n".format(" relation","  error", "value"))
+
+        for s in results[:top_n]:
+            if (s[1] < 0):
+                errsign = "-"
+            else:
+                errsign = " "
+
+            print(" {:<35}{}{:<25}{}".format(s[0], errsign, mp.nstr(abs(s[1]), 15), mp.nstr(s[2], mp.dps)))
+
+    except:
+        print_exc()
 
 
 # ...........................................................................
@@ -291,13 +620,12 @@ def main(argv):
 
     settings_short = None
 
-    mp.dps = 50
-    print(mp.quad(lambda x: mp.exp(-x ** 2), [-mp.inf, mp.inf]) ** 2)
-
     try:
         # ...........................................................................
         # argparse command line argument handling
         # ...........................................................................
+        import argparse
+
         parser = argparse.ArgumentParser(description='hpa : high precision approximation')
 
         parser.add_argument('-a', '--apa', action='store_true', default=True,  help='toggle arbitrary precision')
@@ -306,20 +634,24 @@ def main(argv):
         parser.add_argument('-b', '--tau', action='store_true', default=False, help='enable Tau matching')
         parser.add_argument('-e', '--e',   action='store_true', default=False, help='enable e matching')
         parser.add_argument('-r', '--r',   action='store_true', default=False, help='enable reciprocal matching')
+        parser.add_argument('--trig',      action='store', type=int, nargs='?', const=12, default=0, metavar='M', help='enable sin, cos and tan of k pi / n for n up to M (default 12)')
         parser.add_argument('-s', '--s',   action='store_true', default=False, help='show settings')
         parser.add_argument('-S', '--S',   action='store_true', default=False, help='show verbose settings')
+        parser.add_argument('-R', '--relation', action='store_true', default=False, help='find integer relations with 1 and the multipliers')
         parser.add_argument('-l', '--lic', action='store_true', default=False, help='show license and exit')
         parser.add_argument('-u', '--use', action='store_true', default=False, help='show usage and exit')
         parser.add_argument("-T", "--time",action="store_true", help="show run time")
 
         parser.add_argument('-A', '--prec',     action='store', type=int, default=100,  help='arbitrary precision digit count')
+        parser.add_argument('-g', '--engine',   action='store', choices=['scan', 'cf', 'numpy', 'int'], default='scan', help='float screen, or int to search at full precision')
+        parser.add_argument('-m', '--margin',   action='store', type=int, default=10,   help='extra candidates checked at full precision')
         parser.add_argument('-n', '--ndmx',     action='store', type=int, default=1000, help='numerator and denominator limit')
         parser.add_argument('-2', '--sqrt',     action='store', type=int, default=10,   help='square root max integer value')
         parser.add_argument('-3', '--cbrt',     action='store', type=int, default=10,   help='cube root max integer value')
         parser.add_argument('-x', '--top',      action='store', type=int, default=10,   help='number of approximations')
         parser.add_argument('-t', '--thr',      action='store', type=float, default=1e-9, help='sensitivity threshold value')
-        parser.add_argument('-v', '--val',      action='store', type=float, default=None, help='value to approximate')
-        parser.add_argument('value', nargs='?', action='store', type=float, default=None, help='value to approximate')
+        parser.add_argument('-v', '--val',      action='store', type=str, default=None, help='value to approximate')
+        parser.add_argument('value', nargs='?', action='store', type=str, default=None, help='value to approximate')
 
         args = parser.parse_args()
 
@@ -333,8 +665,12 @@ def main(argv):
         rargs['enable_e']     = args.e
         rargs['enable_tau']   = args.tau
         rargs['enable_recip'] = args.r
+        rargs['trig']         = args.trig
         rargs['settings']     = args.s
         rargs['verbose']      = args.S
+        rargs['prec']         = args.prec
+        rargs['margin']       = args.margin
+        rargs['engine']       = args.engine
 
         if args.use:
             parser.print_usage()
@@ -350,13 +686,22 @@ def main(argv):
         if args.val is None:
             args.val = args.value
 
+        from mpmath import mp
+
+        # the value is read at the full precision, not as a float
+        mp.dps = args.prec
+
         if args.val is None:
-            args.val = math.pi
+            target = +mp.pi
+        else:
+            target = mp.mpf(args.val)
 
-        target = args.val
         top_n = args.top
 
-        hpa_report(target, top_n, **rargs)
+        if args.relation:
+            hap_relation_report(target, top_n, **rargs)
+        else:
+            hpa_report(target, top_n, **rargs)
 
         time_end = time.time()
         if args.time:
@@ -372,6 +717,6 @@ if __name__ == '__main__':
     try:
         main(sys.argv)
     except:
-        traceback.print_exc()
+        print_exc()
 
 # ...........................................................................
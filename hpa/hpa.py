@@ -20,7 +20,7 @@
 #
 # ...........................................................................
 #
-# 2022-06-29 09:45
+# 2026-10-20 10:00
 #
 # ...........................................................................
 #
@@ -56,184 +56,1407 @@
 # 2019-12-29 18:40 '-T time option'
 # 2022-06-28 18:40 '-P match pi squared'
 # 2022-06-28 18:40 '-E match e squared'
+# 2026-10-18 09:30 '-g cf' continued fraction engine
+# 2026-10-18 10:15 '-g numpy' vectorized engine, basis built by hpa_basis()
+# 2026-10-18 11:00 '-B' batch mode with JSON lines or CSV output
+# 2026-10-18 12:00 Config and Matcher replace module globals, hpa() is reentrant
+# 2026-10-18 13:00 '-j' worker processes
+# 2026-10-18 14:00 only the top results are kept, multipliers that can not make the top are skipped
+# 2026-10-18 15:00 '-c' canonical basis, '-C' expand equivalents, exact square/cube test (cbrt(64))
+# 2026-10-18 16:00 'index build' and '-I' lookups in a memory mapped index (index.py)
+# 2026-10-18 17:00 '-k' result cache (cache.py)
+# 2026-10-18 21:30 '--stats' search counters and phase timings, Stats
+# 2026-10-18 22:30 'serve' JSON lines server and '--connect' client (server.py)
+# 2026-10-18 23:30 traceback and argparse imported when needed, package __init__ and __main__
+# 2026-10-19 09:00 iter_approximations() gives results as they are found, hpa_search() consumes hpa_iter()
+# 2026-10-19 10:00 '--time-budget' anytime search raising the limit in rounds, Results
+# 2026-10-19 11:00 '--pairs' products and quotients of two constants (pairs.py)
+# 2026-10-19 12:00 '--trig' sin, cos and tan of rational multiples of pi
+# 2026-10-19 13:00 results are Approximation records, text made when printed
+# 2026-10-19 14:00 'sweep' sharded scans that checkpoint and resume (sweep.py), -n 1e9
+# 2026-10-19 15:00 '--interval' simplest approximations within the precision of the value
+# 2026-10-19 16:00 '--watch' follow a value as it is refined (watch.py)
+# 2026-10-19 17:00 '--transforms' match x^2, x^3, 1/x, ln x and e^x with the one basis (transforms.py)
+# 2026-10-19 18:00 with top results held the scan engine takes the improvements hpa_p_cf() found
 # ...........................................................................
 
-import traceback
 import math
-import argparse
 import os
 import sys
 import time
+import collections
+import heapq
+import bisect
 # for python2:
 import fractions
 
+try:
+    from math import gcd
+except ImportError:
+    # python2
+    from fractions import gcd
+
+# wall clock for Stats
+timer = getattr(time, 'perf_counter', time.time)
+
+
+# ...........................................................................
+# search configuration
+#
+# frozen so one Matcher (and its basis) can be shared between threads
+# ...........................................................................
+Config = collections.namedtuple('Config', [
+    'ndmx', 'sm', 'cm', 'thr',
+    'enable_e', 'enable_e2', 'enable_pi', 'enable_pi2', 'enable_phi', 'enable_tau',
+    'enable_recip', 'engine', 'canonical', 'trig'])
+
+Config.__new__.__defaults__ = (1000, 10, 10, 1e-9, False, False, False, False, False, False, False, 'scan', False, 0)
+
+
+# ...........................................................................
+# Config from the keyword arguments used by hpa(), other keys are ignored
+# ...........................................................................
+def make_config(**kwargs):
+
+    return Config(**dict((k, v) for k, v in kwargs.items() if k in Config._fields))
+
+
+# ...........................................................................
+# named constants : [config field, multiplier, text, short setting, verbose setting, form]
+#
+# form is [coefficient, atoms] as for root_form()
+# ...........................................................................
+CONSTANTS = (
+    ('enable_e',   math.e,             "e",          "e",   "matching e",          (1, (("e", 1),))),
+    ('enable_e2',  math.e * math.e,    "e squared",  "e2",  "matching e squared",  (1, (("e", 2),))),
+    ('enable_pi',  math.pi,            "Pi",         "pi",  "matching pi",         (1, (("pi", 1),))),
+    ('enable_pi2', math.pi * math.pi,  "Pi squared", "pi2", "matching pi squared", (1, (("pi", 2),))),
+    ('enable_phi', (1 + 5 ** 0.5) / 2, "Phi",        "phi", "matching phi",        (1, (("phi", 1),))),
+    ('enable_tau', math.pi * 2.0,      "Tau",        "tau", "matching tau",        (2, (("pi", 1),))),
+)
+
+
+# ...........................................................................
+# Approximation : one result, (p / q) * multiplier with its error and value
+#
+#   p, q       numerator and denominator
+#   basis      multiplier text, as "* sqrt(2)" or "ratio"
+#   error      value - target
+#   value      (p * multiplier) / q
+#
+# It is also the tuple [text, error, value, p, q, basis] of earlier
+# versions : r[0] to r[5], unpacking, and == with such a tuple all work.
+# The text is only made when asked for, so results that are never printed
+# cost no formatting.
+# ...........................................................................
+class Approximation(object):
+
+    __slots__ = ('p', 'q', 'basis', 'error', 'value')
+
+    FIELDS = ('text', 'error', 'value', 'p', 'q', 'basis')
+
+    def __init__(self, p, q, basis, error, value):
+
+        self.p = p
+        self.q = q
+        self.basis = basis
+        self.error = error
+        self.value = value
+
+    # .......................................................................
+    # from a result tuple, as read back from JSON
+    # .......................................................................
+    @classmethod
+    def from_row(cls, row):
+
+        return cls(row[3], row[4], row[5], row[1], row[2])
+
+    # .......................................................................
+    @property
+    def text(self):
+
+        # :0.0f needed for python2 compatibility
+        return "({} / {:.0f})  {}".format(self.p, self.q, self.basis)
+
+    # .......................................................................
+    def row(self):
+
+        return (self.text, self.error, self.value, self.p, self.q, self.basis)
+
+    def __getitem__(self, i):
+
+        if isinstance(i, slice):
+            return self.row()[i]
+
+        return getattr(self, self.FIELDS[i])
+
+    def __len__(self):
+
+        return 6
+
+    def __iter__(self):
+
+        return iter(self.row())
+
+    def __eq__(self, other):
+
+        try:
+            return self.row() == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+
+        equal = self.__eq__(other)
+        if equal is NotImplemented:
+            return equal
+        return not equal
+
+    def __hash__(self):
+
+        return hash(self.row())
+
+    def __repr__(self):
+
+        return "Approximation(p={!r}, q={!r}, basis={!r}, error={!r}, value={!r})".format(
+            self.p, self.q, self.basis, self.error, self.value)
+
+
+# ...........................................................................
+# Matcher : basis built once from a Config, then matched against any target
+#
+# all search state is local to match() so a Matcher is safe to share
+#
+# hpa_report(), hpa_batch() and Cache take any matcher : an object with
+# match(target, jobs, pool, top, stats, deadline) giving results as
+# Matcher.match() does, settings_short, settings_verbose and
+# equivalents(result).  A Cache keys results on its cache_settings if it
+# has them, else on its config, else on its path (an Index).
+# ...........................................................................
+class Matcher(object):
+
+    def __init__(self, config=None, stats=None, **kwargs):
+
+        if config is None:
+            config = make_config(**kwargs)
+
+        start = timer()
+
+        self.config = config
+        self.basis = hpa_basis(config)
+        self.aliases = {}
+
+        if config.canonical:
+            self.basis, self.aliases = hpa_canonical(self.basis)
+
+        self.basis = tuple(self.basis)
+        self.settings_short, self.settings_verbose = hpa_settings(config)
+
+        if stats is not None:
+            stats.phase("basis", timer() - start)
+
+    # .......................................................................
+    # return sorted list of Approximation, which are also the tuples :
+    #   [text of approximation, error, actual value, numerator, denominator, multiplier text]
+    #
+    # jobs > 1 spreads the basis over a process pool, or pass a
+    # multiprocessing pool to reuse one across calls
+    #
+    # top limits the results to the top best, the same as the first top of
+    # the full list, without keeping or sorting the rest
+    #
+    # stats, a Stats, gathers counters and timings of the search
+    #
+    # deadline, a time.time() value, returns the best found by then as
+    # Results : the limit is raised from 100 to ndmx in rounds (see
+    # hpa_deepen()) in this process, jobs and pool are not used
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        config = self.config
+        multipliers = [b[0] for b in self.basis]
+        results = []
+
+        counts = None
+        if stats is not None:
+            counts = {}
+            start = timer()
+
+        if deadline is not None:
+            end = timer() + (deadline - time.time())
+            found, searched = hpa_deepen(target, config.ndmx, config.thr, config.engine, multipliers, top, end, counts)
+        elif pool is None and jobs > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(jobs)
+            try:
+                found = hpa_search_pool(pool, jobs, target, config, multipliers, top, counts)
+            finally:
+                pool.close()
+                pool.join()
+        elif pool is not None:
+            found = hpa_search_pool(pool, max(jobs, 1), target, config, multipliers, top, counts)
+        else:
+            found = hpa_search(target, config.ndmx, config.thr, config.engine, multipliers, top, counts=counts)
+
+        if stats is not None:
+            stats.phase("search", timer() - start)
+            start = timer()
+
+        if top is not None:
+            # chunks from the pool each hold their own top best
+            kept = TopK(top)
+            for i, rows in enumerate(found):
+                kept.extend(i, rows)
+            found = kept.found(range(len(found)))
+
+        for (f, fp, form), rows in zip(self.basis, found):
+            for nb, db, t in rows:
+                results.append(Approximation(nb, db, fp, t, (nb * f) / db))
+
+        results.sort(key=takeSecond)
+
+        if stats is not None:
+            stats.phase("sort", timer() - start)
+            for i, (b, rows) in enumerate(zip(self.basis, found)):
+                c = counts.get(i) or Stats.counts()
+                c['kept'] = len(rows)
+                stats.add(b[1], c)
+
+        if deadline is not None:
+            results = Results(results)
+            results.ndmx = searched
+            results.partial = searched < config.ndmx
+
+        return results
+
+    # .......................................................................
+    # the simplest explanations of target known to +/- tolerance : for each
+    # multiplier the simplest p/q with p/q * multiplier in the interval (see
+    # hpa_simplest()), ordered by the digits of p and q then by error
+    #
+    # The interval, not ndmx or thr, bounds the search, each multiplier
+    # taking O(log) steps.  numdenmax, if given, leaves out results with p or
+    # q over it.  Return sorted list of Approximation.
+    # .......................................................................
+    def match_interval(self, target, tolerance, top=None, stats=None, numdenmax=None):
+
+        results = []
+
+        if stats is not None:
+            start = timer()
+
+        for f, fp, form in self.basis:
+            c = None
+            if stats is not None:
+                c = Stats.counts()
+                begin = timer()
+
+            lo = fractions.Fraction(target - tolerance) / fractions.Fraction(f)
+            hi = fractions.Fraction(target + tolerance) / fractions.Fraction(f)
+            nb, db = hpa_simplest(lo, hi, c)
+
+            if numdenmax is None or max(nb, db) <= numdenmax:
+                value = (nb * f) / db
+                results.append(Approximation(nb, db, fp, value - target, value))
+                if c is not None:
+                    c['kept'] = 1
+
+            if c is not None:
+                c['seconds'] = timer() - begin
+                stats.add(fp, c)
+
+        results.sort(key=simplest_key)
+
+        if stats is not None:
+            stats.phase("search", timer() - start)
+
+        if top is not None:
+            results = results[:top]
+
+        return results
+
+    # .......................................................................
+    # results, as from match(), given as they are found
+    #
+    # With top set only those that make the top best at the time are given.
+    # With snapshot set pairs [result, best so far] are given, best so far
+    # being the sorted top results (all results if top is None) found up to
+    # then.  The last best so far is what match() returns.  The search stops
+    # when the caller stops taking results.
+    # .......................................................................
+    def iter_approximations(self, target, top=None, snapshot=False, stats=None):
+
+        config = self.config
+        multipliers = [b[0] for b in self.basis]
+
+        counts = None
+        given = {}
+        if stats is not None:
+            counts = {}
+            start = timer()
+
+        errors = []
+        best = []
+
+        try:
+            for i, (nb, db, t) in hpa_iter(target, config.ndmx, config.thr, config.engine, multipliers, top, counts=counts):
+                f, fp, form = self.basis[i]
+                result = Approximation(nb, db, fp, t, (nb * f) / db)
+
+                given[i] = given.get(i, 0) + 1
+
+                if not snapshot:
+                    yield result
+                    continue
+
+                # after equal errors, as the stable sort of match()
+                k = bisect.bisect_right(errors, abs(t))
+                errors.insert(k, abs(t))
+                best.insert(k, result)
+                if top is not None:
+                    del errors[top:], best[top:]
+
+                yield result, list(best)
+        finally:
+            if stats is not None:
+                stats.phase("search", timer() - start)
+                for i in sorted(counts):
+                    counts[i]['kept'] = given.get(i, 0)
+                    stats.add(self.basis[i][1], counts[i])
+
+    # .......................................................................
+    # the same approximation written with the multipliers that the
+    # canonical basis did not search, as a list of Approximation
+    # .......................................................................
+    def equivalents(self, result):
+
+        pretty, t, value, nb, db, fp = result[:6]
+
+        same = []
+        for alias, factor in self.aliases.get(fp, ()):
+            p = fractions.Fraction(nb) * factor / db
+            same.append(Approximation(p.numerator, p.denominator, alias, t, value))
+
+        return same
+
+
+# ...........................................................................
+# TopK : the top best improvements seen, as a bounded heap
+#
+# entries are ordered by [error, basis index, position in scan] so the kept
+# set is the first top of a stable sort by error of every improvement
+# ...........................................................................
+class TopK(object):
+
+    def __init__(self, top):
+
+        self.top = top
+        self.heap = []
+
+    # .......................................................................
+    # the error an improvement has to beat to be kept
+    # .......................................................................
+    def bound(self):
+
+        if self.top is None or len(self.heap) < self.top:
+            return float("inf")
+
+        if not self.heap:
+            return float("-inf")
+
+        return -self.heap[0][0]
+
+    # .......................................................................
+    # add the hpa_p() improvements of basis index i
+    # .......................................................................
+    def extend(self, i, rows):
+
+        for j, row in enumerate(rows):
+            self.add(i, j, row)
+
+    # .......................................................................
+    # add improvement j of basis index i, return True if it is kept
+    # .......................................................................
+    def add(self, i, j, row):
+
+        if self.top is None or self.top < 1:
+            return False
+
+        # heapq is a min heap so the worst entry is kept first by negating
+        entry = (-abs(row[2]), -i, -j, row)
+        if len(self.heap) < self.top:
+            heapq.heappush(self.heap, entry)
+        elif entry[:3] > self.heap[0][:3]:
+            heapq.heapreplace(self.heap, entry)
+        else:
+            return False
+
+        return True
+
+    # .......................................................................
+    # kept improvements as hpa_p() results, one list for each basis index
+    # .......................................................................
+    def found(self, index):
+
+        kept = {}
+        for e, i, j, row in sorted(self.heap, key=lambda entry: (-entry[1], -entry[2])):
+            kept.setdefault(-i, []).append(row)
+
+        return [kept.get(i, []) for i in index]
+
+
+# ...........................................................................
+# Stats : counters and timers of the search, for --stats or a callback
+#
+# Pass one to Matcher() for the basis build and to match() for the search.
+# Counters are kept for each multiplier (by text) and summed over calls :
+#   iterations    numerators tried
+#   tests         candidate ratios tested (test_ratio calls in hpa_p)
+#   improvements  candidates better than all before them
+#   gcd_rejected  improvements not in lowest terms
+#   kept          results returned
+#   skipped       scans skipped as unable to make the top
+#   errors        scans ended by an exception
+#   seconds       search time (not for the numpy engine)
+# and the seconds of each phase : basis, search, sort, report.
+#
+# callback, if given, is called as callback(kind, name, data) with kind
+# "constant" (name the multiplier text, data its counters for one search) or
+# "phase" (name the phase, data its seconds).
+#
+# With no Stats the engines only count improvements, so it costs nothing
+# to leave in.
+# ...........................................................................
+class Stats(object):
+
+    FIELDS = ('iterations', 'tests', 'improvements', 'gcd_rejected', 'kept', 'skipped', 'errors', 'seconds')
+
+    def __init__(self, callback=None):
+
+        self.callback = callback
+        self.phases = collections.OrderedDict()
+        self.constants = collections.OrderedDict()
+
+    # .......................................................................
+    # a new set of counters, all zero
+    # .......................................................................
+    @staticmethod
+    def counts():
+
+        return dict((field, 0) for field in Stats.FIELDS)
+
+    # .......................................................................
+    # add the seconds of a phase
+    # .......................................................................
+    def phase(self, name, seconds):
+
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+        if self.callback is not None:
+            self.callback("phase", name, seconds)
+
+    # .......................................................................
+    # add the counters of one multiplier
+    # .......................................................................
+    def add(self, text, counts):
+
+        total = self.constants.setdefault(text, self.counts())
+        for field in self.FIELDS:
+            total[field] += counts.get(field, 0)
+        if self.callback is not None:
+            self.callback("constant", text, counts)
+
+    # .......................................................................
+    # counters summed over every multiplier
+    # .......................................................................
+    def totals(self):
+
+        total = self.counts()
+        for counts in self.constants.values():
+            for field in self.FIELDS:
+                total[field] += counts[field]
+
+        return total
+
+    # .......................................................................
+    # --stats text : phases, then the slowest multipliers and the totals
+    # .......................................................................
+    def report(self, slowest=20):
+
+        lines = ["{:<35} {:>10}".format(" phase", "seconds")]
+        for name, seconds in self.phases.items():
+            lines.append(" {:<34} {:>10.4f}".format(name, seconds))
+
+        heading = ["iterations", "tests", "improved", "gcd", "kept", "skipped", "errors", "seconds"]
+        row = " {:<34}" + " {:>11}" * 7 + " {:>10.4f}"
+
+        lines.append("")
+        lines.append(("{:<35}" + " {:>11}" * 7 + " {:>10}").format(" multiplier", *heading))
+
+        order = sorted(self.constants.items(), key=lambda item: (-item[1]['seconds'], -item[1]['iterations']))
+        for text, counts in order[:slowest]:
+            lines.append(row.format(text, *[counts[field] for field in self.FIELDS]))
+
+        if len(order) > slowest:
+            lines.append(" ... {} more".format(len(order) - slowest))
+
+        total = self.totals()
+        lines.append(row.format("total", *[total[field] for field in self.FIELDS]))
+
+        return lines
+
+
+# ...........................................................................
+# Results : the list match() returns when given a deadline, with
+#   partial   True if the deadline came before every multiplier was
+#             searched to ndmx
+#   ndmx      the limit every multiplier was searched to
+# ...........................................................................
+class Results(list):
+
+    partial = False
+    ndmx = None
+
+
 # ...........................................................................
 # high precision approximation
 #
-# return sorted list of triplets : [text of approximation, error, actual value]
+# return sorted list of Approximation, which are also the tuples :
+#   [text of approximation, error, actual value, numerator, denominator, multiplier text]
+#
+# thin wrapper building a Matcher for one target, reuse a Matcher for many
+#
+# budget, in seconds, gives the best found in about that time as Results
 # ...........................................................................
-def hpa(target, **kwargs):
+def hpa(target, jobs=1, top=None, budget=None, **kwargs):
 
-    global results, settings_short, settings_verbose, PY3
+    deadline = None
+    if budget is not None:
+        deadline = time.time() + budget
 
-    PY3 = sys.version_info[0] == 3
+    return Matcher(make_config(**kwargs)).match(target, jobs, top=top, deadline=deadline)
 
-    results = []
 
-    settings_short = ""
-    settings_verbose = []
+# ...........................................................................
+# approximations given as they are found, see Matcher.iter_approximations()
+#
+#   for result, best in iter_approximations(0.917795181104714, top=10, snapshot=True):
+#       show(best)
+# ...........................................................................
+def iter_approximations(target, config=None, top=None, snapshot=False, **kwargs):
 
-    ndmax   = kwargs['ndmx']
-    sm      = kwargs['sm']
-    cm      = kwargs['cm']
-    thresh  = kwargs['thr']
-    recip   = kwargs['enable_recip']
+    if config is None:
+        config = make_config(**kwargs)
 
-    hpa_p(target, ndmax, thresh, 1.0, "ratio")
-    settings_short = "settings: nd {} sm {} cm {} thr {}".format(ndmax, sm, cm, thresh)
+    return Matcher(config).iter_approximations(target, top, snapshot)
 
-    settings_verbose.append("{:<35} : {}".format("numerator/denominator limit", ndmax))
 
-    settings_verbose.append("{:<35} : {}".format("square root max", sm))
+# ...........................................................................
+# run the selected engine over a list of multipliers
+#
+# return list of hpa_p() results, one for each multiplier
+#
+# With top set only improvements that make the top best are kept, ordered as
+# a stable sort by error of all results would order them: by error, then
+# basis index (index gives the basis positions of the multipliers), then
+# position in the scan.
+#
+# counts, if given, is a dict filled with {basis index: counters}
+# ...........................................................................
+def hpa_search(tval, numdenmax, thresh, engine, multipliers, top=None, index=None, counts=None):
 
-    settings_verbose.append("{:<35} : {}".format("cube root max", cm))
+    if index is None:
+        index = range(len(multipliers))
 
-    settings_verbose.append("{:<35} : {}".format("threshold", thresh))
+    found = collections.OrderedDict((i, []) for i in index)
+    for i, row in hpa_iter(tval, numdenmax, thresh, engine, multipliers, top, index, counts):
+        found[i].append(row)
 
-    if recip:
-        settings_short = settings_short + " recip"
-        settings_verbose.append("{:<35} : {}".format("matching reciprocals", True))
+    if top is None:
+        return list(found.values())
+
+    kept = TopK(top)
+    for i, rows in found.items():
+        kept.extend(i, rows)
+
+    return kept.found(index)
+
+
+# ...........................................................................
+# improvements as they are found : pairs [basis index, (numerator,
+# denominator, error)] in basis order, then scan order
+#
+# With top set only improvements that make the top best at the time are
+# given (a later one may push them out again).  Once top results are held,
+# hpa_p_cf() finds the same improvements as the scan in O(log numdenmax)
+# steps, so the scan engine takes those under the worst of them from it and
+# only the first multipliers, until top results are held, are scanned.
+#
+# The scan engine gives each improvement as hpa_p() finds it until top
+# results are held, the cf engine those of a multiplier at a time and the
+# numpy engine those of the top once the whole basis is done.  Nothing more
+# is searched once the caller stops.
+#
+# stop, if given, is called with the basis index before each multiplier is
+# searched (None before the whole basis for the numpy engine) and ends the
+# search if it returns True
+# ...........................................................................
+def hpa_iter(tval, numdenmax, thresh, engine, multipliers, top=None, index=None, counts=None, stop=None):
+
+    if index is None:
+        index = range(len(multipliers))
+
+    kept = TopK(top)
+
+    # denominators of hpa_np() are float64, exact only below 2^53 : the scan
+    # takes a value too small (or 0) for them, as its integers do not run out
+    if engine == 'numpy' and not (len(multipliers) and tval > 0 and
+                                  (numdenmax * max(multipliers)) / tval + 1 < 2 ** 53):
+        engine = 'scan'
+
+    if engine == 'numpy':
+        if stop is not None and stop(None):
+            return
+        tally = None
+        if counts is not None:
+            tally = [Stats.counts() for m in multipliers]
+            counts.update(zip(index, tally))
+        found = hpa_np(tval, numdenmax, thresh, multipliers, counts=tally, top=top)
+        for i, rows in zip(index, found):
+            for j, row in enumerate(rows):
+                if top is None or kept.add(i, j, row):
+                    yield i, row
+        return
+
+    if engine == 'cf':
+        search = hpa_p_cf
+    else:
+        search = hpa_p_iter
+
+    for i, multiplier in zip(index, multipliers):
+        if stop is not None and stop(i):
+            return
+
+        bound = kept.bound()
+
+        c = None
+        if counts is not None:
+            c = counts[i] = Stats.counts()
+            start = timer()
+
+        # Exception, not a bare except, so GeneratorExit still ends the search
+        try:
+            if search is hpa_p_iter and bound < float("inf"):
+                # hpa_p_cf() finds the improvements of the scan under the
+                # bound, so they are taken as they are rather than scanned
+                rows = hpa_p_cf(tval, numdenmax, thresh, multiplier, bound, c)
+                if not rows and c is not None:
+                    c['skipped'] += 1
+            else:
+                rows = search(tval, numdenmax, thresh, multiplier, bound, c)
+
+            for j, row in enumerate(rows):
+                if top is None or kept.add(i, j, row):
+                    yield i, row
+        except Exception:
+            print_exc()
+            if c is not None:
+                c['errors'] += 1
+
+        if c is not None:
+            c['seconds'] = timer() - start
+
+
+# ...........................................................................
+# anytime search : the whole basis at a small limit, then again at ten times
+# the limit in rounds until numdenmax or the deadline, a timer() value
+#
+# The time of a multiplier in one round, scaled by the rise in the limit,
+# is taken as its time in the next.  A round ends at the first multiplier
+# that would not finish before the deadline, those left keeping the results
+# of the round before, so the results at the deadline are the best found.
+#
+# The numpy engine searches the whole basis at once, so a round can only
+# end before it starts, and its time grows with the limit by much more
+# than the cost of the last round foretells; the cf engine, which gives the
+# same results a multiplier at a time, is used in its place.
+#
+# return list of hpa_p() results, one for each multiplier, and the limit
+# every multiplier was searched to (0 if the first round did not finish)
+# ...........................................................................
+def hpa_deepen(tval, numdenmax, thresh, engine, multipliers, top, deadline, counts=None):
+
+    if engine == 'numpy':
+        engine = 'cf'
+
+    found = [[] for m in multipliers]
+    searched = 0
+
+    # seconds of each multiplier (None for the whole basis) in the last round
+    cost = {}
+    rise = 0.0
+    limit = min(numdenmax, 100)
+
+    def stop(i):
+        return timer() + rise * cost.get(i, 0.0) > deadline
+
+    while True:
+        spent = {}
+        rows = dict((i, []) for i in range(len(multipliers)))
+
+        start = timer()
+        for i, row in hpa_iter(tval, limit, thresh, engine, multipliers, top, counts=spent, stop=stop):
+            rows[i].append(row)
+        cost[None] = timer() - start
+
+        for i, c in spent.items():
+            found[i] = rows[i]
+            cost[i] = c['seconds']
+            if counts is not None:
+                total = counts.setdefault(i, Stats.counts())
+                for field in Stats.FIELDS:
+                    total[field] += c[field]
+
+        if len(spent) < len(multipliers):
+            break
+
+        searched = limit
+        if limit >= numdenmax:
+            break
+
+        rise = min(numdenmax, limit * 10) / float(limit)
+        limit = min(numdenmax, limit * 10)
+
+    return found, searched
+
+
+# ...........................................................................
+# hpa_search() for one chunk of the basis in a worker process
+#
+# return list of pairs : [basis index, hpa_p() result], and the counters
+# by basis index if asked for
+# ...........................................................................
+def hpa_search_chunk(args):
+
+    tval, numdenmax, thresh, engine, top, chunk, counted = args
+
+    # basis order within the chunk keeps the ordering of ties with top
+    chunk = sorted(chunk)
+    index = [c[0] for c in chunk]
+
+    counts = {} if counted else None
+    found = hpa_search(tval, numdenmax, thresh, engine, [c[1] for c in chunk], top, index, counts)
+
+    return list(zip(index, found)), counts
+
+
+# ...........................................................................
+# hpa_search() spread over a process pool
+#
+# The cost of a scan depends on the multiplier: numerators run until n or
+# d = n * fixed / tval reaches the limit.  Multipliers are dealt, most
+# expensive first, onto the least loaded of several chunks per job and the
+# chunks are handed out as workers become free.  Results are put back in
+# basis order so the ranking is the same as a serial run.
+# ...........................................................................
+def hpa_search_pool(pool, jobs, tval, config, multipliers, top=None, counts=None):
+
+    ndmx = config.ndmx
+
+    def cost(multiplier):
+        if config.engine == 'cf':
+            return 1.0
+        return 1.0 + min(ndmx, ndmx * tval / multiplier)
+
+    nchunks = min(len(multipliers), 4 * jobs)
+    chunks = [[] for c in range(nchunks)]
+    loads = [0.0] * nchunks
+
+    for i in sorted(range(len(multipliers)), key=lambda i: -cost(multipliers[i])):
+        c = loads.index(min(loads))
+        chunks[c].append((i, multipliers[i]))
+        loads[c] += cost(multipliers[i])
+
+    order = sorted(range(nchunks), key=lambda c: -loads[c])
+    tasks = [(tval, ndmx, config.thr, config.engine, top, chunks[c], counts is not None) for c in order if chunks[c]]
 
-    if kwargs['enable_e']:
-        hpa_pr(target, ndmax, thresh, math.e, "e", recip)
-        settings_short = settings_short + " e"
-        settings_verbose.append("{:<35} : {}".format("matching e", True))
-
-    if kwargs['enable_e2']:
-        e2 = math.e * math.e
-        hpa_pr(target, ndmax, thresh, e2, "e squared", recip)
-        settings_short = settings_short + " e2"
-        settings_verbose.append("{:<35} : {}".format("matching e squared", True))
-
-    if kwargs['enable_pi']:
-        hpa_pr(target, ndmax, thresh, math.pi, "Pi", recip)
-        settings_short = settings_short + " pi"
-        settings_verbose.append("{:<35} : {}".format("matching pi", True))
-
-    if kwargs['enable_pi2']:
-        pi2 = math.pi * math.pi
-        hpa_pr(target, ndmax, thresh, pi2, "Pi squared", recip)
-        settings_short = settings_short + " pi2"
-        settings_verbose.append("{:<35} : {}".format("matching pi squared", True))
-
-    if kwargs['enable_phi']:
-        phi = (1 + 5 ** 0.5) / 2
-        hpa_pr(target, ndmax, thresh, phi, "Phi", recip)
-        settings_short = settings_short + " phi"
-        settings_verbose.append("{:<35} : {}".format("matching phi", True))
-
-    if kwargs['enable_tau']:
-        tau = math.pi * 2.0
-        hpa_pr(target, ndmax, thresh, tau, "Tau", recip)
-        settings_short = settings_short + " tau"
-        settings_verbose.append("{:<35} : {}".format("matching tau", True))
+    found = [None] * len(multipliers)
+    for part, part_counts in pool.imap_unordered(hpa_search_chunk, tasks):
+        for i, rows in part:
+            found[i] = rows
+        if counts is not None:
+            counts.update(part_counts)
+
+    return found
+
+
+# ...........................................................................
+# basis of multipliers : list of triplets [multiplier, text, form], ratio first
+# ...........................................................................
+def hpa_basis(config):
+
+    basis = [(1.0, "ratio", (1, ()))]
+
+    sm    = config.sm
+    cm    = config.cm
+    recip = config.enable_recip
+
+    for field, multiplier, rp, short, verbose, form in CONSTANTS:
+        if getattr(config, field):
+            basis_pr(basis, multiplier, rp, recip, form)
 
     for s in range (2,sm+1):
-        a = math.sqrt(s)
-        b = int(math.sqrt(s))
+        form = root_form(s, 2)
         # skip squares 4, 9, 16 etc
-        if a > b:
-            hpa_pr(target, ndmax, thresh, math.sqrt(s), "sqrt({})".format(s), recip)
+        if form[1]:
+            basis_pr(basis, math.sqrt(s), "sqrt({})".format(s), recip, form)
 
     for s in range (2,cm+1):
-        a = math.pow(s,1.0/3)
-        b = int(math.pow(s,1.0/3))
+        form = root_form(s, 3)
         # skip cubes 8, 27 etc
-        if a > b:
-            hpa_pr(target, ndmax, thresh, math.pow(s,1.0/3), "cbrt({})".format(s), recip)
+        if form[1]:
+            basis_pr(basis, math.pow(s,1.0/3), "cbrt({})".format(s), recip, form)
+
+    for multiplier, rp, form in hpa_trig(config.trig):
+        basis_pr(basis, multiplier, rp, recip, form)
+
+    return basis
+
+
+# ...........................................................................
+# trigonometric multipliers : |sin|, |cos| and |tan| of k * pi / n for n up
+# to m, as a list of triplets [multiplier, text, form], kept in TRIG by m
+#
+# Values that are equal are listed once, under the first name made (n, then
+# k, then cos, sin, tan): sin(pi/3) = cos(pi/6) as sin x = cos(pi/2 - x), and
+# sin, cos and tan are taken to pi/2 as the rest are the same values.
+# Rational values (cos(pi/3), tan(pi/4)) are left out.  A value whose square
+# is rational, as sin(pi/4) = sqrt(2) / 2, has the form of that root so -c
+# treats it as a rational multiple of the root, the rest are atoms of their
+# own named by the text.
+# ...........................................................................
+TRIG = {}
+
+def hpa_trig(m):
+
+    if m in TRIG:
+        return TRIG[m]
+
+    half = fractions.Fraction(1, 2)
+
+    table = []
+    seen = set()
+
+    for n in range(2, m + 1):
+        for k in range(1, n // 2 + 1):
+            if gcd(k, n) != 1:
+                continue
+            a = fractions.Fraction(k, n)
+            angle = "{}pi/{}".format(k if k > 1 else "", n)
+
+            # cos(a pi) and sin(a pi) = cos((1/2 - a) pi) by the cos angle, tan by its own
+            for name, key, f in (("cos", ('cos', a), math.cos),
+                                 ("sin", ('cos', half - a), math.sin),
+                                 ("tan", ('tan', a), math.tan)):
+                if key in seen or (name == "tan" and a == half):
+                    continue
+                seen.add(key)
+
+                multiplier = f(math.pi * k / n)
+                text = "{}({})".format(name, angle)
+
+                # the square, if rational, to an exact form
+                square = fractions.Fraction(multiplier * multiplier).limit_denominator(1000)
+                if abs(float(square) - multiplier * multiplier) < 1e-12:
+                    if square == 0:
+                        continue
+                    coef, atoms = root_form(square.numerator * square.denominator, 2)
+                    if not atoms:
+                        continue
+                    form = (fractions.Fraction(coef, square.denominator), atoms)
+                else:
+                    form = (1, ((text, 1),))
+
+                table.append((multiplier, text, form))
 
-    results = sorted(results, key=takeSecond, reverse=False)
+    TRIG[m] = table
 
-    return results
+    return table
 
 
 # ...........................................................................
-# call with and without reciprocal
+# add multiplier with and without reciprocal
 # ...........................................................................
-def hpa_pr(tval, numdenmax, thresh, multiplier, rp, recip):
+def basis_pr(basis, multiplier, rp, recip, form):
 
-    hpa_p(tval, numdenmax, thresh, multiplier, "* " + rp)
+    basis.append((multiplier, "* " + rp, form))
 
     if recip:
-        hpa_p(tval, numdenmax, thresh, 1.0/multiplier, "* recip " + rp)
+        basis.append((1.0/multiplier, "* recip " + rp, recip_form(form)))
+
+
+# ...........................................................................
+# form of the k-th root of integer s : [coefficient, atoms]
+#
+# A multiplier is coefficient times the product of its atoms: primes to a
+# fraction of a power in (0, 1) and named constants to a whole power.  Two
+# multipliers with the same atoms are rational multiples of one another,
+# e.g. sqrt(8) = 2 * 2^(1/2), cbrt(4) = 4 * 2^(-1/3) = 2 * recip cbrt(2).
+# ...........................................................................
+def root_form(s, k):
+
+    coef = 1
+    atoms = []
+
+    p = 2
+    while p * p <= s:
+        e = 0
+        while s % p == 0:
+            s //= p
+            e += 1
+        if e:
+            coef *= p ** (e // k)
+            if e % k:
+                atoms.append((str(p), fractions.Fraction(e % k, k)))
+        p += 1
+
+    if s > 1:
+        atoms.append((str(s), fractions.Fraction(1, k)))
+
+    return coef, tuple(sorted(atoms))
+
+
+# ...........................................................................
+# form of the reciprocal of a multiplier with the given form
+# ...........................................................................
+def recip_form(form):
+
+    coef = 1 / fractions.Fraction(form[0])
+    atoms = []
+
+    for name, e in form[1]:
+        if name.isdigit():
+            # keep the power of a prime in (0, 1), the rest goes to the coefficient
+            whole = int(math.floor(-e))
+            coef *= fractions.Fraction(int(name)) ** whole
+            if -e - whole:
+                atoms.append((name, -e - whole))
+        else:
+            atoms.append((name, -e))
+
+    return coef, tuple(sorted(atoms))
+
+
+# ...........................................................................
+# canonical basis : one multiplier searched for each set of rational multiples
+#
+# the first multiplier of each set (in basis order) is searched, the others
+# become aliases of it : {text: [alias text, factor]} with
+#   multiplier = factor * alias
+# ...........................................................................
+def hpa_canonical(basis):
+
+    first = {}
+    canonical = []
+    aliases = {}
+
+    for multiplier, text, form in basis:
+        coef, atoms = form
+        if atoms in first:
+            rep_text, rep_coef = first[atoms]
+            aliases.setdefault(rep_text, []).append((text, fractions.Fraction(rep_coef) / coef))
+        else:
+            first[atoms] = (text, coef)
+            canonical.append((multiplier, text, form))
+
+    return canonical, aliases
+
+
+# ...........................................................................
+# short and verbose settings text
+# ...........................................................................
+def hpa_settings(config):
+
+    settings_short = "settings: nd {} sm {} cm {} thr {}".format(config.ndmx, config.sm, config.cm, config.thr)
+
+    settings_verbose = []
+
+    settings_verbose.append("{:<35} : {}".format("numerator/denominator limit", config.ndmx))
+
+    settings_verbose.append("{:<35} : {}".format("square root max", config.sm))
+
+    settings_verbose.append("{:<35} : {}".format("cube root max", config.cm))
+
+    settings_verbose.append("{:<35} : {}".format("threshold", config.thr))
+
+    if config.engine != 'scan':
+        settings_short = settings_short + " " + config.engine
+        settings_verbose.append("{:<35} : {}".format("search engine", config.engine))
+
+    if config.enable_recip:
+        settings_short = settings_short + " recip"
+        settings_verbose.append("{:<35} : {}".format("matching reciprocals", True))
+
+    if config.canonical:
+        settings_short = settings_short + " canon"
+        settings_verbose.append("{:<35} : {}".format("canonical basis", True))
+
+    for field, multiplier, rp, short, verbose, form in CONSTANTS:
+        if getattr(config, field):
+            settings_short = settings_short + " " + short
+            settings_verbose.append("{:<35} : {}".format(verbose, True))
+
+    if config.trig:
+        settings_short = settings_short + " trig {}".format(config.trig)
+        settings_verbose.append("{:<35} : {}".format("trig of k pi / n for n up to", config.trig))
 
+    return settings_short, settings_verbose
 
+
+# ...........................................................................
+# scan every numerator n, trying denominators either side of n * fixed / tval
+#
+# return list of triplets : [numerator, denominator, error] for each
+# improvement in lowest terms, leaving out errors no smaller than bound
+#
+# counts, if given, is a dict of counters as made by Stats.counts() to add to
 # ...........................................................................
-def hpa_p(tval, numdenmax, thresh, fixed, fixed_p):
+def hpa_p(tval, numdenmax, thresh, fixed, bound=float("inf"), counts=None):
+
+    return list(hpa_p_iter(tval, numdenmax, thresh, fixed, bound, counts))
+
 
-    global n, d, t, nb, db, best, results, f, fp
+# ...........................................................................
+# hpa_p() as a generator : each improvement is given as soon as it is found
+# ...........................................................................
+def hpa_p_iter(tval, numdenmax, thresh, fixed, bound=float("inf"), counts=None):
 
     best = 1e6
-    f = fixed
-    fp = fixed_p
     n = 0
     d = 0
-    t = 0.0
-    nb = 0
-    db = 0
 
-    try:
-        while (max(n,d) < numdenmax) & (best > thresh):
-            n += 1
-            d = math.floor( (n * f)/ tval )
-            try:
-                t = ((n * f)/ d) - tval
-            except:
-                # t = math.inf
-                t = float("inf")
-            test_ratio()
+    # only counted on improvements, which are rare, so the loop is unchanged
+    improved = 0
+    rejected = 0
 
-            d += 1
+    while (max(n,d) < numdenmax) & (best > thresh):
+        n += 1
+        d = math.floor( (n * fixed)/ tval )
+        try:
+            t = ((n * fixed)/ d) - tval
+        except:
+            # t = math.inf
+            t = float("inf")
 
-            t = ((n * f) / d) - tval
-            test_ratio()
+        # greatest common divisor used to avoid redundant ratios
+        if abs(t) < best:
+            best = abs(t)
+            improved += 1
+            if abs(t) < bound:
+                if gcd(n, d) < 2:
+                    yield n, d, t
+                else:
+                    rejected += 1
 
-    except:
-        traceback.print_exc()
+        d += 1
+
+        t = ((n * fixed) / d) - tval
+        if abs(t) < best:
+            best = abs(t)
+            improved += 1
+            if abs(t) < bound:
+                if gcd(n, d) < 2:
+                    yield n, d, t
+                else:
+                    rejected += 1
+
+    if counts is not None:
+        counts['iterations'] += n
+        counts['tests'] += 2 * n
+        counts['improvements'] += improved
+        counts['gcd_rejected'] += rejected
 
 
 # ...........................................................................
-def test_ratio():
+# continued fraction engine
+#
+# Only numerators on the Stern-Brocot path of tval/fixed (convergents and
+# semiconvergents) can improve on every smaller numerator, so the scan of
+# hpa_p() is replayed for those numerators only.  The semiconvergents of each
+# partial quotient approach tval/fixed monotonically from one side, so the
+# first improving one is found by bisection rather than by walking the whole
+# run.  The improvements found are the same as those of hpa_p().
+# ...........................................................................
+def hpa_p_cf(tval, numdenmax, thresh, fixed, bound=float("inf"), counts=None):
+
+    found = []
+
+    # iterations, tests, improvements, gcd rejections
+    tally = [0, 0, 0, 0]
+
+    def reached(m):
+        # the scan tests numerator m only if numerator m - 1 left max(n,d) below the limit
+        if m < 2:
+            return True
+        return max(m - 1, math.floor(((m - 1) * fixed) / tval) + 1) < numdenmax
+
+    def improves(m, best):
+        tally[1] += 2
+        dm = math.floor((m * fixed) / tval)
+        if dm > 0 and abs(((m * fixed) / dm) - tval) < best:
+            return True
+        return abs(((m * fixed) / (dm + 1)) - tval) < best
+
+    def visit(n, best):
+        # one pass of the hpa_p() loop, returns the new best
+        tally[0] += 1
+        tally[1] += 2
+        d = math.floor((n * fixed) / tval)
+        try:
+            t = ((n * fixed) / d) - tval
+        except:
+            t = float("inf")
+
+        if abs(t) < best:
+            best = abs(t)
+            tally[2] += 1
+            if abs(t) < bound:
+                if gcd(n, d) < 2:
+                    found.append((n, d, t))
+                else:
+                    tally[3] += 1
 
-    global n, d, t, nb, db, best, results, f, fp, PY3
+        d += 1
 
-    if ( abs(t) < best ):
-        nb = n
-        db = d
-        best = abs(t)
+        t = ((n * fixed) / d) - tval
+        if abs(t) < best:
+            best = abs(t)
+            tally[2] += 1
+            if abs(t) < bound:
+                if gcd(n, d) < 2:
+                    found.append((n, d, t))
+                else:
+                    tally[3] += 1
+
+        return best
+
+    best = visit(1, 1e6)
+
+    # convergents p0/q0 = p(k-2)/q(k-2) and p1/q1 = p(k-1)/q(k-1)
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    r = fractions.Fraction(tval) / fractions.Fraction(fixed)
+
+    while best > thresh:
+        a = int(math.floor(r))
+
+        # semiconvergent numerators p0 + j * p1 for j = 1..a
+        if p1 > 0 and a > 0:
+            lo = 1
+            hi = a
+            if not reached(p0 + hi * p1):
+                # last j the scan gets to before max(n,d) reaches the limit
+                top = 0
+                while lo <= hi:
+                    mid = (lo + hi) // 2
+                    if reached(p0 + mid * p1):
+                        top = mid
+                        lo = mid + 1
+                    else:
+                        hi = mid - 1
+                lo = 1
+                hi = top
+
+            j = lo
+            while j <= hi and best > thresh:
+                if not improves(p0 + j * p1, best):
+                    # bisect for the first improving semiconvergent
+                    if not improves(p0 + hi * p1, best):
+                        break
+                    lo = j + 1
+                    top = hi
+                    while lo < top:
+                        mid = (lo + top) // 2
+                        if improves(p0 + mid * p1, best):
+                            top = mid
+                        else:
+                            lo = mid + 1
+                    j = top
+                best = visit(p0 + j * p1, best)
+                j += 1
+
+            if hi < a:
+                break
+
+        p0, q0, p1, q1 = p1, q1, a * p1 + p0, a * q1 + q0
+
+        if r == a:
+            break
+
+        r = 1 / (r - a)
+
+    if counts is not None:
+        for key, value in zip(('iterations', 'tests', 'improvements', 'gcd_rejected'), tally):
+            counts[key] += value
+
+    return found
 
-        # greatest common divisor used to avoid redundant ratios
-        # print("{} / {}  best {}  value {} gcd {}".format(nb, db, best, nb/db, math.gcd(nb,db)))
-        # if math.gcd(nb,db) < 2: # for python2 : if gcd(nb, db) < 2:
 
-        gcd_ok = False
+# ...........................................................................
+# simplest rational in the interval [lo, hi], 0 < hi, as a pair [numerator,
+# denominator] : of the rationals in the interval it has the smallest
+# denominator and the smallest numerator
+#
+# The continued fractions of lo and hi are followed while their partial
+# quotients agree, the first that differ being replaced by the smallest
+# integer in between, so it takes O(log) steps whatever the width.  lo and
+# hi are taken exactly, as Fraction, so the interval is not widened.
+#
+# counts, if given, is a dict of counters as made by Stats.counts() to add to
+# ...........................................................................
+def hpa_simplest(lo, hi, counts=None):
 
-        if PY3:
-            if math.gcd(nb,db) < 2:
-                gcd_ok =  True
-        else:
-            if fractions.gcd(nb, db) < 2:
-                gcd_ok = True
+    lo = fractions.Fraction(lo)
+    hi = fractions.Fraction(hi)
 
-        if gcd_ok:
-            # :0.0f needed for python2 compatibility
-            pretty = "({} / {:.0f})  {}".format(nb, db, fp)
-            # print("{} / {}  pretty {}".format(nb, db, pretty))
+    if lo <= 0:
+        # 0 is not an approximation, 1/q is the simplest above it
+        return 1, -(-hi.denominator // hi.numerator)
 
-            try:
-                results.append ((pretty, t, (nb * f)/ db) )
-            except:
-                pass
+    terms = []
+    while True:
+        a = lo.numerator // lo.denominator
+        if a == lo:
+            terms.append(a)
+            break
+        if a + 1 <= hi:
+            terms.append(a + 1)
+            break
+        terms.append(a)
+        lo, hi = 1 / (hi - a), 1 / (lo - a)
+
+    if counts is not None:
+        counts['iterations'] += len(terms)
+
+    p, q = terms[-1], 1
+    for a in reversed(terms[:-1]):
+        p, q = a * p + q, p
+
+    return p, q
+
+
+# ...........................................................................
+# numpy engine
+#
+# The scan of hpa_p() for every multiplier in the basis at once: one row per
+# multiplier, numerators taken a chunk at a time.  Candidates are laid out in
+# scan order (floor then floor + 1 for each numerator) so a running minimum
+# along each row gives the same improvements as hpa_p().
+# Rows drop out once the limit or threshold ends their scan.
+#
+# return list of hpa_p() results, one for each multiplier, with top set only
+# the first top of them all by error, basis index and position in the scan
+# as TopK keeps them, picked out here rather than one at a time by TopK
+#
+# counts is a list of counters, one for each multiplier
+#
+# numdenmax * max(multipliers) / tval must be below 2^53 so every
+# denominator is exact, hpa_iter() uses the scan otherwise
+# ...........................................................................
+def hpa_np(tval, numdenmax, thresh, multipliers, bound=float("inf"), cells=1 << 20, counts=None, top=None):
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required for the numpy engine (-g numpy)")
+        raise
+
+    fixed = np.array(multipliers, dtype=np.float64)
+    found = [(np.zeros(0, np.int64), np.zeros(0), np.zeros(0), np.zeros(0))]
+
+    # numerators and improvements of each multiplier
+    if counts is not None:
+        tally = (np.zeros(len(fixed), np.int64), np.zeros(len(fixed), np.int64))
+
+    best = np.full(len(fixed), 1e6)
+    last = np.zeros(len(fixed))
+    live = np.arange(len(fixed))
+    start = 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while live.size:
+            # numerators never pass the limit, and the chunk grows with the
+            # numerators done so multipliers that stop early (large ones
+            # reach the limit on the denominator first) waste few cells
+            chunk = min(max(64, min(start, cells // live.size)), max(1, int(numdenmax) - start + 1))
+            num = np.arange(start, start + chunk, dtype=np.float64)
+
+            nf = fixed[live, None] * num
+            d1 = np.floor(nf / tval)
+            d2 = d1 + 1
+
+            t = np.empty((live.size, 2 * chunk))
+            t[:, 0::2] = np.where(d1 == 0, np.inf, nf / d1 - tval)
+            t[:, 1::2] = nf / d2 - tval
+
+            # best before each candidate
+            running = np.minimum.accumulate(np.hstack((best[live, None], np.abs(t))), axis=1)
+            before = running[:, :-1]
+
+            # the scan only reaches a numerator while max(n,d) < limit and best > threshold
+            prev_d = np.hstack((last[live, None], d2[:, :-1]))
+            prev_n = num - 1
+            go = (np.maximum(prev_n, prev_d) < numdenmax) & (before[:, 0::2] > thresh)
+            go = np.logical_and.accumulate(go, axis=1)
+
+            improved = (np.abs(t) < before) & np.repeat(go, 2, axis=1)
+
+            if counts is not None:
+                tally[0][live] += go.sum(axis=1)
+                tally[1][live] += improved.sum(axis=1)
+
+            r, c = np.nonzero(improved & (np.abs(t) < bound))
+            found.append((live[r], start + c // 2, np.where(c % 2, d2[r, c // 2], d1[r, c // 2]), t[r, c]))
+
+            best[live] = running[:, -1]
+            last[live] = d2[:, -1]
+            live = live[go[:, -1]]
+            start += chunk
+
+    # back into basis order, numerators ascending within each multiplier
+    i, nb, db, t = [np.concatenate(a) for a in zip(*found)]
+    order = np.argsort(i, kind='stable')
+    i, nb, db, t = i[order], nb[order].astype(np.int64), db[order].astype(np.int64), t[order]
+
+    # greatest common divisor used to avoid redundant ratios
+    keep = np.gcd(nb, db) < 2
+    rejected = i[~keep]
+    i, nb, db, t = i[keep], nb[keep], db[keep], t[keep]
+
+    if top is not None:
+        # a stable sort by error leaves ties in basis then scan order
+        keep = np.sort(np.argsort(np.abs(t), kind='stable')[:max(top, 0)])
+        i, nb, db, t = i[keep], nb[keep], db[keep], t[keep]
+
+    rows = list(zip(nb.tolist(), db.tolist(), t.tolist()))
+    ends = np.searchsorted(i, np.arange(len(fixed) + 1)).tolist()
+
+    if counts is not None:
+        rejected = np.bincount(rejected, minlength=len(fixed))
+        for k in range(len(fixed)):
+            counts[k]['iterations'] += int(tally[0][k])
+            counts[k]['tests'] += 2 * int(tally[0][k])
+            counts[k]['improvements'] += int(tally[1][k])
+            counts[k]['gcd_rejected'] += int(rejected[k])
+
+    return [rows[ends[k]:ends[k + 1]] for k in range(len(fixed))]
+
+
+# ...........................................................................
+# print the exception being handled, traceback is only imported when needed
+# ...........................................................................
+def print_exc():
+
+    import traceback
+    traceback.print_exc()
 
 
 # ...........................................................................
@@ -269,12 +1492,23 @@ def takeSecond(elem):
     return abs(elem[1])
 
 
+# ...........................................................................
+# order of match_interval() : fewest digits, then smallest error
+# ...........................................................................
+def simplest_key(elem):
+    return (len(str(elem[3])) + len(str(elem[4])), abs(elem[1]))
+
+
 # ...........................................................................
 # call hpa and report result set
+#
+# tolerance, if given, reports the simplest approximations within target
+# +/- tolerance (see Matcher.match_interval())
 # ...........................................................................
-def hpa_report(target, top_n, **kwargs):
+def hpa_report(target, top_n, matcher=None, jobs=1, stats=None, budget=None, tolerance=None, **kwargs):
 
-    global settings_short, settings_verbose
+    if matcher is None:
+        matcher = Matcher(make_config(**kwargs), stats)
 
     # ...........................................................................
     # remember if negative
@@ -288,19 +1522,31 @@ def hpa_report(target, top_n, **kwargs):
         tval = target
         sign = " "
 
-    results = hpa(tval, **kwargs)
+    if tolerance is not None:
+        results = matcher.match_interval(tval, tolerance, top=top_n, stats=stats)
+    elif budget is None:
+        results = matcher.match(tval, jobs, top=top_n, stats=stats)
+    else:
+        results = matcher.match(tval, jobs, top=top_n, stats=stats, deadline=time.time() + budget)
+
+    start = timer()
 
     try:
-        if kwargs['settings']:
+        if kwargs.get('settings'):
             print("")
-            print(" {:<35}".format(settings_short))
+            print(" {:<35}".format(matcher.settings_short))
 
-        if kwargs['verbose']:
+        if kwargs.get('verbose'):
             print("")
-            for s in settings_verbose:
+            for s in matcher.settings_verbose:
                 print(" {:<35}".format(s))
 
-        print("\n top {} best approximations to {}\n".format(top_n, target))
+        if tolerance is None:
+            print("\n top {} best approximations to {}\n".format(top_n, target))
+        else:
+            print("\n top {} simplest approximations to {} +/- {:g}\n".format(top_n, target, tolerance))
+        if getattr(results, 'partial', False):
+            print(" partial : every multiplier searched to {} in {} seconds\n".format(results.ndmx, budget))
         print("{:<35}{:21}{:15}\n".format(" approximation","  error", "value"))
 
         try:
@@ -313,26 +1559,223 @@ def hpa_report(target, top_n, **kwargs):
                     errsign = " "
 
                 print("{}{:<35}{}{:.15f}\t{:.15f}".format(sign, s[0], errsign, abs(s[1]), s[2]))
+
+                if kwargs.get('expand'):
+                    for e in matcher.equivalents(s):
+                        print("{}{:<35}{}{:.15f}\t{:.15f}".format(sign, e[0], errsign, abs(e[1]), e[2]))
         except:
             pass
 
     except:
-        traceback.print_exc()
+        print_exc()
+
+    if stats is not None:
+        stats.phase("report", timer() - start)
 
 
 # ...........................................................................
-def main(argv):
+# batch mode : approximate every value in a file (or stdin for "-")
+#
+# one value per line, blank lines and lines starting with # are skipped
+# writes the top_n results per value as JSON lines or CSV rows of
+#   target, rank, p, q, basis, error, value
+# with budget, seconds per value, JSON lines also have partial
+#
+# interval, if not None, finds the simplest approximations within each
+# value's tolerance : written after it (0.9177951+-2e-7), else interval, or
+# if that is 0 a unit of its last digit.  A value written with a
+# tolerance is taken as an interval whatever interval is.  JSON lines then
+# also have tolerance.
+#
+# A result of a Transforms (transforms.py) has its transform as well, in
+# JSON lines and as a last CSV column : value = sign of target * the
+# inverse of the transform of p/q * basis.
+# ...........................................................................
+def hpa_batch(source, top_n, fmt="jsonl", out=None, jobs=1, matcher=None, stats=None, budget=None, interval=None, **kwargs):
+
+    if out is None:
+        out = sys.stdout
+
+    if fmt == "csv":
+        import csv
+        writer = csv.writer(out, lineterminator="\n")
+        header = ["target", "rank", "p", "q", "basis", "error", "value"]
+        if getattr(matcher, 'transforms', None) is not None:
+            header.append("transform")
+        writer.writerow(header)
+    else:
+        import json
 
-    global timing, tval, settings_short
+    # the basis does not depend on the target so is only built once
+    if matcher is None:
+        matcher = Matcher(make_config(**kwargs), stats)
 
-    time_start = time.time()
+    # as is the worker pool
+    pool = None
+    if jobs > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(jobs)
 
-    settings_short = None
+    if source == "-":
+        lines = sys.stdin
+    else:
+        lines = open(source)
+
+    try:
+        for line_no, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            tolerance = None
+            try:
+                if interval is not None or "+-" in line or "+/-" in line or u"\u00b1" in line:
+                    target, tolerance = parse_interval(line, interval)
+                else:
+                    target = float(line)
+            except ValueError:
+                sys.stderr.write("hpa: line {}: not a value: {}\n".format(line_no, line))
+                continue
+
+            # only a Matcher has match_interval(), not a Cache, Index or Client
+            if tolerance is not None and not hasattr(matcher, 'match_interval'):
+                sys.stderr.write("hpa: line {}: a tolerance needs a search, not {}: {}\n".format(
+                    line_no, type(matcher).__name__, line))
+                continue
+
+            # as hpa_report() : search on the magnitude, restore the sign
+            if target < 0:
+                sign = -1
+            else:
+                sign = 1
+
+            if tolerance is not None:
+                results = matcher.match_interval(sign * target, tolerance, top_n, stats)
+            elif budget is None:
+                results = matcher.match(sign * target, jobs, pool, top_n, stats)
+            else:
+                results = matcher.match(sign * target, jobs, pool, top_n, stats, time.time() + budget)
+
+            start = timer()
+
+            for rank, s in enumerate(results, 1):
+                transform = getattr(s, 'transform', None)
+                if transform is None:
+                    row = (target, rank, sign * s[3], s[4], s[5].replace("* ", "", 1), sign * s[1], sign * s[2])
+                else:
+                    row = (target, rank, s.sign * s[3], s[4], s[5].replace("* ", "", 1), sign * s[1], sign * s[2])
+                if fmt == "csv":
+                    if len(header) > 7:
+                        row += (transform or "",)
+                    writer.writerow(row)
+                else:
+                    record = dict(zip(("target", "rank", "p", "q", "basis", "error", "value"), row))
+                    if transform is not None:
+                        record["transform"] = transform
+                    if budget is not None:
+                        record["partial"] = getattr(results, 'partial', False)
+                    if tolerance is not None:
+                        record["tolerance"] = tolerance
+                    out.write(json.dumps(record))
+                    out.write("\n")
+
+            if stats is not None:
+                stats.phase("report", timer() - start)
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    out.flush()
+
+
+# ...........................................................................
+# import a module next to this one, as part of the hpa package or when
+# hpa.py is run as a script
+# ...........................................................................
+def hpa_module(name):
+
+    import importlib
+
+    if __package__:
+        return importlib.import_module("." + name, __package__)
+
+    return importlib.import_module(name)
+
+
+# ...........................................................................
+# whole number argument, also written as 1e9, anything else (1.5) an error
+# ...........................................................................
+def whole(text):
+
+    import argparse
+
+    try:
+        return int(text)
+    except ValueError:
+        pass
+
+    try:
+        value = float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("not a number: {}".format(text))
+
+    if not value.is_integer():
+        raise argparse.ArgumentTypeError("not a whole number: {}".format(text))
+
+    return int(value)
+
+
+# ...........................................................................
+# a value and its uncertainty from text : "0.9177951+-2e-7" (or +/- or the
+# plus-minus sign) is known to the tolerance written, otherwise to
+# tolerance if given, else to a unit of its last digit, "0.9177951" to
+# +/- 0.0000001 as it may have been rounded or cut short
+#
+# return pair [value, tolerance]
+# ...........................................................................
+def parse_interval(text, tolerance=None):
+
+    text = text.strip()
+    for mark in (u"\u00b1", "+/-", "+-"):
+        if mark in text:
+            text, written = text.split(mark, 1)
+            return float(text), abs(float(written))
+
+    value = float(text)
+    if tolerance:
+        return value, abs(tolerance)
+
+    import decimal
+    exponent = decimal.Decimal(text).as_tuple().exponent
+    if not isinstance(exponent, int):
+        raise ValueError("no digits to take a tolerance from: {}".format(text))
+
+    return value, 10.0 ** exponent
+
+
+# ...........................................................................
+# value argument : kept as text so --interval can count its digits
+# ...........................................................................
+def number(text):
+
+    parse_interval(text, 1.0)
+    return text
+
+
+# ...........................................................................
+def main(argv):
+
+    time_start = time.time()
 
     try:
         # ...........................................................................
         # argparse command line argument handling
         # ...........................................................................
+        import argparse
+
         parser = argparse.ArgumentParser(description='hpa : high precision approximation')
 
         parser.add_argument('-p', '--pi',  action='store_true', default=False, help='enable Pi matching')
@@ -342,21 +1785,56 @@ def main(argv):
         parser.add_argument('-e', '--e',   action='store_true', default=False, help='enable e matching')
         parser.add_argument('-E', '--e2',  action='store_true', default=False, help='enable e squared matching')
         parser.add_argument('-r', '--r',   action='store_true', default=False, help='enable reciprocal matching')
+        parser.add_argument('-c', '--canon', action='store_true', default=False, help='search each set of rational multiples once')
+        parser.add_argument('-C', '--expand', action='store_true', default=False, help='show equivalent forms skipped by -c')
+        parser.add_argument('--trig',      action='store', type=int, nargs='?', const=12, default=0, metavar='M', help='enable sin, cos and tan of k pi / n for n up to M (default 12)')
         parser.add_argument('-s', '--s',   action='store_true', default=False, help='show settings')
         parser.add_argument('-S', '--S',   action='store_true', default=False, help='show verbose settings')
         parser.add_argument('-l', '--lic', action='store_true', default=False, help='show license and exit')
         parser.add_argument('-u', '--use', action='store_true', default=False, help='show usage and exit')
+        parser.add_argument('--stats',      action='store_true', default=False, help='show search counters and timings')
         parser.add_argument("-T", "--time",action="store_true", help="show run time")
 
-        parser.add_argument('-n', '--ndmx',     action='store', type=int, default=1000, help='numerator and denominator limit')
+        parser.add_argument('-n', '--ndmx',     action='store', type=whole, default=1000, help='numerator and denominator limit')
         parser.add_argument('-2', '--sqrt',     action='store', type=int, default=10,   help='square root max integer value')
         parser.add_argument('-3', '--cbrt',     action='store', type=int, default=10,   help='cube root max integer value')
         parser.add_argument('-x', '--top',      action='store', type=int, default=10,   help='number of approximations')
         parser.add_argument('-t', '--thr',      action='store', type=float, default=1e-9, help='sensitivity threshold value')
-        parser.add_argument('-v', '--val',      action='store', type=float, default=None, help='value to approximate')
-        parser.add_argument('value', nargs='?', action='store', type=float, default=None, help='value to approximate')
-
-        args = parser.parse_args()
+        parser.add_argument('-g', '--engine',   action='store', choices=['scan', 'cf', 'numpy'], default='scan', help='search engine')
+        parser.add_argument('-v', '--val',      action='store', type=number, default=None, help='value to approximate')
+        parser.add_argument('-j', '--jobs',     action='store', type=int, default=1,    help='number of worker processes')
+        parser.add_argument('--interval',       action='store', type=float, nargs='?', const=0.0, default=None, metavar='TOL', help='simplest approximations within value +/- TOL (default a unit of the last digit given)')
+        parser.add_argument('--time-budget',    action='store', type=float, default=None, metavar='SECONDS', help='best found in about SECONDS per value, raising the limit up to -n')
+        parser.add_argument('--transforms',     action='store', nargs='?', const='sq,cube,recip,ln,exp', default=None, metavar='LIST', help='also match transforms of the value, of sq, cube, recip, ln, exp (default all)')
+        parser.add_argument('--watch',          action='store', nargs='?', const='-', default=None, metavar='FILE', help='follow a value refined line by line in FILE (default stdin), showing changes to the top')
+        parser.add_argument('-B', '--batch',    action='store', default=None, metavar='FILE', help='approximate each value in FILE (- for stdin)')
+        parser.add_argument('-F', '--format',   action='store', choices=['jsonl', 'csv'], default='jsonl', help='batch output format')
+        parser.add_argument('-k', '--cache',    action='store', default=None, metavar='FILE', help='cache results in FILE (- for memory only)')
+        parser.add_argument('--cache-mb',       action='store', type=float, default=64, help='cache file size limit in MB')
+        parser.add_argument('--cache-stats',    action='store_true', default=False, help='show cache hits and misses')
+        parser.add_argument('-I', '--index',    action='store', default=None, metavar='FILE', help='look values up in an index made by: hpa.py index build --index FILE')
+        parser.add_argument('--socket',         action='store', default=None, metavar='PATH', help='serve on a Unix socket (hpa.py serve)')
+        parser.add_argument('--port',           action='store', type=int, default=None, help='serve on a localhost port (hpa.py serve)')
+        parser.add_argument('--connect',        action='store', default=None, metavar='ADDR', help='look values up on a server: PORT, HOST:PORT or socket PATH')
+        parser.add_argument('--pairs',          action='store', type=int, nargs='?', const=100, default=None, metavar='N', help='match p/q times two constants, p and q up to N (default 100)')
+        parser.add_argument('--sweep',          action='store', default=None, metavar='DIR', help='sweep directory (hpa.py sweep init|run|status|merge)')
+        parser.add_argument('--shards',         action='store', type=whole, default=16, help='shards of each multiplier (hpa.py sweep init)')
+        parser.add_argument('--multiplier',     action='append', default=None, metavar='TEXT', help='sweep only this multiplier, as Pi or sqrt(2) (repeat for more)')
+        parser.add_argument('--checkpoint',     action='store', type=float, default=60, metavar='SECONDS', help='seconds between sweep checkpoints')
+        parser.add_argument('value', nargs='?', action='store', type=number, default=None, help='value to approximate, as 0.9177951 or 0.9177951+-2e-7')
+
+        # hpa.py index build --index FILE [options] : build an index for the options
+        # hpa.py serve --socket PATH | --port N [options] : serve lookups, the options are the defaults
+        # hpa.py sweep init|run|status|merge --sweep DIR [options] : sharded scan of one value
+        command = argv[1:3]
+        if command == ['index', 'build'] or command in (['sweep', 'init'], ['sweep', 'run'], ['sweep', 'status'], ['sweep', 'merge']):
+            args = parser.parse_args(argv[3:])
+        elif argv[1:2] == ['serve']:
+            command = ['serve']
+            args = parser.parse_args(argv[2:])
+        else:
+            command = None
+            args = parser.parse_args(argv[1:])
 
         rargs = {}
         rargs['thr']          = args.thr
@@ -370,6 +1848,10 @@ def main(argv):
         rargs['enable_e2']    = args.e2
         rargs['enable_tau']   = args.tau
         rargs['enable_recip'] = args.r
+        rargs['engine']       = args.engine
+        rargs['canonical']    = args.canon
+        rargs['trig']         = args.trig
+        rargs['expand']       = args.expand
         rargs['settings']     = args.s
         rargs['verbose']      = args.S
 
@@ -381,26 +1863,170 @@ def main(argv):
             print_license()
             sys.exit(0)
 
+        matcher = None
+
+        stats = None
+        if args.stats:
+            stats = Stats()
+
+        if command == ['serve']:
+            if (args.socket is None) == (args.port is None):
+                parser.error("serve needs one of --socket PATH or --port N")
+            index = None
+            if args.index is not None:
+                index = hpa_module("index").Index(args.index)
+            path = args.cache
+            if path == "-":
+                path = None
+            hpa_module("server").serve(make_config(**rargs), args.socket, args.port, args.jobs, path, args.cache_mb, index)
+            return
+
+        if command is not None and command[0] == 'sweep':
+            if args.sweep is None:
+                parser.error("sweep needs --sweep DIR")
+            sweep = hpa_module("sweep")
+
+            if command[1] == 'init':
+                target = args.value if args.val is None else args.val
+                if target is None:
+                    target = math.pi
+                else:
+                    target = parse_interval(target, 1.0)[0]
+                setup = sweep.init(args.sweep, abs(target), Matcher(make_config(**rargs)), args.shards, args.multiplier)
+                print("{} shards of {} multipliers in {}".format(len(setup['jobs']), len(setup['multipliers']), args.sweep))
+            elif command[1] == 'run':
+                count = sweep.run(args.sweep, args.jobs, args.checkpoint)
+                print("{} shards run".format(count))
+            elif command[1] == 'status':
+                done, running, waiting, scanned, total = sweep.status(args.sweep)
+                print("{} done, {} running, {} waiting, {:.1f}% of numerators".format(done, running, waiting, 100.0 * scanned / max(total, 1)))
+            else:
+                matcher = sweep.Sweep(args.sweep)
+                try:
+                    matcher.merge()
+                except ValueError as e:
+                    sys.stderr.write("hpa: {}\n".format(e))
+                    return
+                hpa_report(matcher.target, args.top, matcher=matcher, stats=stats, **rargs)
+                if stats is not None:
+                    print("")
+                    for line in stats.report():
+                        print(line)
+
+            if args.time:
+                print ( "\n {0:0.2f} seconds".format(time.time() - time_start))
+            return
+
+        if command is not None:
+            if args.index is None:
+                parser.error("index build needs --index FILE")
+            count = hpa_module("index").build(args.index, Matcher(make_config(**rargs)))
+            print("{} entries written to {}".format(count, args.index))
+
+            if args.time:
+                print ( "\n {0:0.2f} seconds".format(time.time() - time_start))
+            return
+
+        if args.index is not None:
+            matcher = hpa_module("index").Index(args.index)
+
+        if args.connect is not None:
+            matcher = hpa_module("server").Client(args.connect, make_config(**rargs))
+
+        interval = args.interval is not None
+        for text in (args.val, args.value):
+            if text is not None and ("+-" in text or "+/-" in text or u"\u00b1" in text):
+                interval = True
+
+        if interval and (args.index is not None or args.connect is not None or args.pairs is not None or args.cache is not None):
+            parser.error("--interval searches the basis itself, not with --index, --connect, --pairs or --cache")
+
+        if args.watch is not None:
+            if args.index is not None or args.connect is not None or args.pairs is not None or args.cache is not None or interval or args.time_budget is not None or args.transforms is not None:
+                parser.error("--watch keeps its own search state, not with --index, --connect, --pairs, --cache, --interval, --time-budget or --transforms")
+            hpa_module("watch").watch(args.watch, Matcher(make_config(**rargs), stats), args.top, stats)
+
+            if stats is not None:
+                print("")
+                for line in stats.report():
+                    print(line)
+            if args.time:
+                print ( "\n {0:0.2f} seconds".format(time.time() - time_start))
+            return
+
+        if args.pairs is not None:
+            if matcher is not None:
+                parser.error("--pairs builds its own table, not with --index or --connect")
+            matcher = hpa_module("pairs").Pairs(Matcher(make_config(**rargs), stats), args.pairs, stats)
+
+        if args.cache is not None:
+            if matcher is None:
+                matcher = Matcher(make_config(**rargs), stats)
+            path = args.cache
+            if path == "-":
+                path = None
+            cache = matcher = hpa_module("cache").Cache(matcher, path, max_bytes=int(args.cache_mb * (1 << 20)))
+
+        if args.transforms is not None:
+            if interval:
+                parser.error("--transforms searches the value as given, not with --interval")
+            if matcher is None:
+                matcher = Matcher(make_config(**rargs), stats)
+            try:
+                matcher = hpa_module("transforms").Transforms(matcher, [t.strip() for t in args.transforms.split(",") if t.strip()])
+            except ValueError as e:
+                parser.error(str(e))
+
+        if args.batch is not None:
+            hpa_batch(args.batch, args.top, args.format, jobs=args.jobs, matcher=matcher, stats=stats, budget=args.time_budget, interval=args.interval, **rargs)
+
+            if stats is not None:
+                sys.stderr.write("\n" + "\n".join(stats.report()) + "\n")
+
+            if args.cache_stats and args.cache is not None:
+                sys.stderr.write("\n cache {}\n".format(cache.stats()))
+            if args.time:
+                sys.stderr.write("\n {0:0.2f} seconds\n".format(time.time() - time_start))
+            return
+
         # ...........................................................................
         # call hpa (via hpa_report()
         # ...........................................................................
         if args.val is None:
             args.val = args.value
 
+        tolerance = None
         if args.val is None:
-            args.val = math.pi
+            target = math.pi
+        elif interval:
+            target, tolerance = parse_interval(args.val, args.interval)
+        else:
+            target = float(args.val)
 
-        target = args.val
         top_n = args.top
 
-        hpa_report(target, top_n, **rargs)
+        hpa_report(target, top_n, matcher=matcher, jobs=args.jobs, stats=stats, budget=args.time_budget, tolerance=tolerance, **rargs)
+
+        if stats is not None:
+            print("")
+            for line in stats.report():
+                print(line)
+
+        if args.cache_stats and args.cache is not None:
+            print("\n cache {}".format(cache.stats()))
 
         time_end = time.time()
         if args.time:
             print ( "\n {0:0.2f} seconds".format(time_end - time_start))
-    except:
-        pass
-#       traceback.print_exc()
+    except SystemExit:
+        # argparse errors and --help, with their own exit status
+        raise
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except Exception as e:
+        # a missing file, index or server is an error for a pipeline too
+        sys.stderr.write("hpa: {}: {}\n".format(type(e).__name__, e))
+        sys.exit(1)
 
 
 # ...........................................................................
@@ -408,7 +2034,9 @@ def main(argv):
 if __name__ == '__main__':
     try:
         main(sys.argv)
+    except SystemExit:
+        raise
     except:
-        traceback.print_exc()
+        print_exc()
 
 # ...........................................................................
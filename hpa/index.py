@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# index.py (hpa candidate index) Sorted file of every p/q * multiplier value for instant lookups
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-19 22:00
+#
+# ...........................................................................
+#
+# 2026-10-18 16:00 first version : 'hpa.py index build --index FILE' and 'hpa.py --index FILE'
+# 2026-10-18 21:30 match() takes a Stats
+# 2026-10-19 10:00 match() takes a deadline
+# 2026-10-19 13:00 results are Approximation
+# 2026-10-19 22:00 Index header says what is particular to it
+# ...........................................................................
+#
+# File layout (little endian) :
+#
+#   8 bytes     magic "HPAIDX01"
+#   8 bytes     count of entries
+#   8 bytes     length of the JSON header
+#   JSON        basis texts and settings, padded with spaces to 8 bytes
+#   count * 8   values   (float64, ascending)
+#   count * 4   p        (uint32)
+#   count * 4   q        (uint32)
+#   count * 2   basis id (uint16)
+#
+# ...........................................................................
+
+import json
+import mmap
+import struct
+import sys
+import time
+import bisect
+
+try:
+    from .hpa import Approximation
+except ImportError:
+    from hpa import Approximation
+
+MAGIC = b"HPAIDX01"
+
+
+# ...........................................................................
+# build an index of every reduced p/q * multiplier with p, q up to the
+# numerator/denominator limit for the basis of a Matcher
+#
+# needs numpy, the whole index is sorted in memory
+# ...........................................................................
+def build(path, matcher):
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("numpy is required to build an index (hpa.py index build)")
+        raise
+
+    ndmx = matcher.config.ndmx
+    basis = matcher.basis
+
+    if len(basis) > 0xffff:
+        raise ValueError("too many multipliers for an index: {}".format(len(basis)))
+
+    # every reduced fraction p/q with p, q <= ndmx
+    grid = np.arange(1, ndmx + 1, dtype=np.int64)
+    p, q = np.meshgrid(grid, grid, indexing='ij')
+    keep = np.gcd(p, q) == 1
+    p = p[keep].astype(np.uint32)
+    q = q[keep].astype(np.uint32)
+
+    # (p * f) / q as in the search so values agree to the last bit
+    values = np.concatenate([(p * b[0]) / q for b in basis])
+    order = np.argsort(values, kind='stable')
+
+    header = json.dumps({
+        'ndmx': ndmx,
+        'basis': [b[1] for b in basis],
+        'settings_short': matcher.settings_short,
+        'settings_verbose': matcher.settings_verbose,
+    }).encode('utf-8')
+    header = header + b" " * (-len(header) % 8)
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<QQ', len(values), len(header)))
+        f.write(header)
+        values[order].astype('<f8').tofile(f)
+        np.tile(p, len(basis))[order].astype('<u4').tofile(f)
+        np.tile(q, len(basis))[order].astype('<u4').tofile(f)
+        np.repeat(np.arange(len(basis), dtype=np.uint16), len(p))[order].astype('<u2').tofile(f)
+
+    return len(values)
+
+
+# ...........................................................................
+# Index : memory mapped index file answering nearest value queries
+#
+# The arrays are views of the mapped file, nothing is copied, so any number
+# of processes can share one index through the page cache.  As a matcher
+# (see Matcher) its results are fixed by the file, so a Cache keys them on
+# path, and its settings are those the index was built with.
+# ...........................................................................
+class Index(object):
+
+    def __init__(self, path):
+
+        if sys.byteorder != 'little':
+            raise ValueError("index files are little endian")
+
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.map[:8] != MAGIC:
+            raise ValueError("not an hpa index: {}".format(path))
+
+        count, size = struct.unpack('<QQ', self.map[8:24])
+        header = json.loads(self.map[24:24 + size].decode('utf-8'))
+
+        self.count = count
+        self.basis = header['basis']
+        self.settings_short = header['settings_short'] + " index"
+        self.settings_verbose = header['settings_verbose'] + ["{:<35} : {}".format("index", path)]
+
+        offset = 24 + size
+        view = self.view = memoryview(self.map)
+        self.values = view[offset:offset + 8 * count].cast('d')
+        offset += 8 * count
+        self.p = view[offset:offset + 4 * count].cast('I')
+        offset += 4 * count
+        self.q = view[offset:offset + 4 * count].cast('I')
+        offset += 4 * count
+        self.b = view[offset:offset + 2 * count].cast('H')
+
+    # .......................................................................
+    # the top nearest values to target as hpa() result tuples
+    #
+    # binary search, then walk outwards taking the nearer side each step,
+    # which takes microseconds so a deadline is not needed
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        if top is None:
+            top = 10
+
+        if stats is not None:
+            start = time.time()
+
+        values = self.values
+        hi = bisect.bisect_left(values, target)
+        lo = hi - 1
+
+        results = []
+        while len(results) < top and (lo >= 0 or hi < self.count):
+            if hi >= self.count or (lo >= 0 and target - values[lo] <= values[hi] - target):
+                i = lo
+                lo -= 1
+            else:
+                i = hi
+                hi += 1
+            results.append(self.result(i, target))
+
+        if stats is not None:
+            stats.phase("search", time.time() - start)
+
+        return results
+
+    # .......................................................................
+    # entry i as an hpa() result
+    # .......................................................................
+    def result(self, i, target):
+
+        value = self.values[i]
+
+        return Approximation(self.p[i], self.q[i], self.basis[self.b[i]], value - target, value)
+
+    # .......................................................................
+    # every form of a value is in the index so there is nothing to add
+    # .......................................................................
+    def equivalents(self, result):
+
+        return []
+
+    # .......................................................................
+    def close(self):
+
+        self.values.release()
+        self.p.release()
+        self.q.release()
+        self.b.release()
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+# ...........................................................................
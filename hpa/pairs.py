@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# pairs.py (hpa pairs) Match products and quotients of two basis constants
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-19 22:00
+#
+# ...........................................................................
+#
+# 2026-10-19 11:00 first version : 'hpa.py --pairs N'
+# 2026-10-19 13:00 results are Approximation
+# 2026-10-19 20:00 walks stop past the error of the top held so far
+# 2026-10-19 22:00 Pairs header says what is particular to it
+# ...........................................................................
+#
+# Meet in the middle : p/q * c1 * c2 = target is p/q * c1 = target / c2, so
+# a sorted table of every p/q * c1 (p, q up to the table limit, c1 over the
+# basis) is built once and searched for target / c2 for each second constant
+# c2, the basis constants and their reciprocals.  A pair costs a binary
+# search, not a scan.
+#
+# Pairs that are a rational multiple of a basis constant (sqrt(2) * sqrt(3)
+# with sqrt(6) in the basis, or sqrt(2) * sqrt(2)) are left to the normal
+# search, and of pairs that are rational multiples of one another (Pi *
+# sqrt(2), sqrt(2) * Pi, Pi / recip sqrt(2)) only the first is searched.
+# ...........................................................................
+
+import bisect
+import fractions
+import math
+import time
+
+try:
+    from .hpa import Approximation, TopK, gcd, takeSecond
+except ImportError:
+    from hpa import Approximation, TopK, gcd, takeSecond
+
+
+# ...........................................................................
+# atoms of the product of two multipliers of the given forms, as in
+# root_form() : primes to a fraction of a power in (0, 1), named constants
+# to a whole power
+# ...........................................................................
+def pair_atoms(a, b):
+
+    powers = {}
+    for name, e in a[1] + b[1]:
+        powers[name] = powers.get(name, 0) + e
+
+    atoms = []
+    for name, e in powers.items():
+        if name.isdigit():
+            e -= int(math.floor(e))
+        if e:
+            atoms.append((name, fractions.Fraction(e)))
+
+    return tuple(sorted(atoms))
+
+
+# ...........................................................................
+# Pairs : products and quotients of two constants of a Matcher's basis
+#
+# The table is built once for the basis and limit, then each match() is a
+# matcher's (see Matcher) : the top pairs nearest the target.  The results
+# do not depend on the engine, so it is left out of cache_settings, and a
+# pair has no equivalent forms listed.
+# ...........................................................................
+class Pairs(object):
+
+    def __init__(self, matcher, limit=100, stats=None):
+
+        start = time.time()
+
+        self.matcher = matcher
+        self.limit = limit
+        basis = matcher.basis
+
+        self.settings_short = "{} pairs {}".format(matcher.settings_short, limit)
+        self.settings_verbose = matcher.settings_verbose + ["{:<35} : {}".format("pairs table limit", limit)]
+        self.cache_settings = ['pairs', limit] + list(matcher.config._replace(engine=None))
+
+        # second constants : [multiplier, text, form], the basis then the reciprocals
+        seconds = []
+        for f, text, form in basis[1:]:
+            seconds.append((f, "* " + text[2:], form))
+        for f, text, form in basis[1:]:
+            coef, atoms = form
+            recip = (1 / fractions.Fraction(coef), tuple((name, -e) for name, e in atoms))
+            seconds.append((1.0 / f, "/ " + text[2:], recip))
+
+        # allowed[k] : basis indices of the first constants searched with second k
+        single = set(b[2][1] for b in basis)
+        seen = set()
+        self.seconds = []
+        for f, text, form in seconds:
+            allowed = set()
+            for i, b in enumerate(basis):
+                atoms = pair_atoms(b[2], form)
+                if atoms in single or atoms in seen:
+                    continue
+                seen.add(atoms)
+                allowed.add(i)
+            if allowed:
+                self.seconds.append((f, text, allowed))
+
+        # table of p/q * c1 with p, q up to limit, in lowest terms
+        ratios = [(p, q) for p in range(1, limit + 1) for q in range(1, limit + 1) if gcd(p, q) == 1]
+        table = sorted(((p * b[0]) / q, p, q, i) for i, b in enumerate(basis) for p, q in ratios)
+
+        self.values = [t[0] for t in table]
+        self.entries = [t[1:] for t in table]
+
+        if stats is not None:
+            stats.phase("pairs table", time.time() - start)
+
+    # .......................................................................
+    # as Matcher.match() : the top pairs nearest target
+    #
+    # for each second constant the table is walked outwards from target / c2
+    # taking the nearer side each step, as Index.match(), so the top nearest
+    # of each are found without looking at the rest.  The walk stops once
+    # the error is past the top held so far, first constants that are not
+    # allowed with the second included, as the rest are further still.
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        if top is None:
+            top = 10
+
+        start = time.time()
+
+        basis = self.matcher.basis
+        values = self.values
+        count = len(values)
+
+        # rounding of errors taken from the one target
+        eps = 4e-16 * target
+
+        kept = TopK(top)
+        results = []
+        for s, (f2, text2, allowed) in enumerate(self.seconds):
+            want = target / f2
+            hi = bisect.bisect_left(values, want)
+            lo = hi - 1
+
+            taken = 0
+            while taken < top and (lo >= 0 or hi < count):
+                if hi >= count or (lo >= 0 and want - values[lo] <= values[hi] - want):
+                    k = lo
+                    lo -= 1
+                else:
+                    k = hi
+                    hi += 1
+
+                value = values[k] * f2
+                if abs(value - target) > kept.bound() + eps:
+                    break
+
+                p, q, i = self.entries[k]
+                if i not in allowed:
+                    continue
+                taken += 1
+
+                text1 = basis[i][1]
+                if text1 == "ratio":
+                    fp = text2
+                else:
+                    fp = "{} {}".format(text1, text2)
+
+                results.append(Approximation(p, q, fp, value - target, value))
+                kept.add(s, taken, (p, q, value - target))
+
+        results.sort(key=takeSecond)
+
+        if stats is not None:
+            stats.phase("search", time.time() - start)
+
+        return results[:top]
+
+    # .......................................................................
+    def equivalents(self, result):
+
+        return []
+
+# ...........................................................................
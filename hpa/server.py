@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# ...........................................................................
+#
+# server.py (hpa server) Answer lookups from a long lived process with a warm basis
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-19 22:00
+#
+# ...........................................................................
+#
+# 2026-10-18 22:30 first version : 'hpa.py serve' and 'hpa.py --connect ADDR'
+# 2026-10-19 10:00 budget of a request, seconds for an anytime search
+# 2026-10-19 13:00 Client results are Approximation
+# 2026-10-19 19:00 cache_settings of a Client, for '--connect ADDR -k FILE'
+# 2026-10-19 22:00 Client header says what is particular to it
+# ...........................................................................
+#
+# Protocol : one JSON object per line each way, on a Unix socket or a
+# localhost port.  Requests
+#
+#   {"id": 1, "value": 0.917795181104714, "top": 10, "settings": {"sm": 100, "enable_pi": true}}
+#   {"op": "settings", "settings": {...}}
+#   {"op": "stats"}
+#
+# settings are Config fields, missing ones take the server's values.  The
+# id is sent back with the reply, replies to one connection may come back in
+# any order.  A "budget" in seconds gives the best found in that time (see
+# Matcher.match() deadline), the reply then has partial and ndmx
+#
+#   {"id": 1, "results": [[text, error, value, p, q, basis], ...], "seconds": 0.01}
+#   {"settings_short": "...", "settings_verbose": [...]}
+#   {"requests": 12, "caches": {...}}
+#   {"id": 1, "error": "message"}
+#
+# Negative values are searched on their magnitude, with p, error and value
+# negated as in batch mode.
+# ...........................................................................
+
+import asyncio
+import collections
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+try:
+    from .hpa import Approximation, Matcher, Results, make_config
+    from .cache import Cache
+except ImportError:
+    from hpa import Approximation, Matcher, Results, make_config
+    from cache import Cache
+
+# basis of this many settings are kept warm in each process
+MATCHERS = 16
+
+matchers = collections.OrderedDict()
+matchers_lock = threading.Lock()
+
+
+# ...........................................................................
+# the Matcher for a Config, built once and kept while recently used
+# ...........................................................................
+def warm(config):
+
+    with matchers_lock:
+        matcher = matchers.pop(config, None)
+        if matcher is None:
+            matcher = Matcher(config)
+        matchers[config] = matcher
+        while len(matchers) > MATCHERS:
+            matchers.popitem(last=False)
+
+    return matcher
+
+
+# ...........................................................................
+# search in a worker : settings are passed as a dict of Config fields so they
+# pickle the same whether hpa.py is the main script or imported
+# ...........................................................................
+def serve_search(fields, target, top, deadline=None):
+
+    results = warm(make_config(**fields)).match(target, top=top, deadline=deadline)
+    if deadline is None:
+        return results
+
+    # attributes of a list subclass are lost when pickled
+    return list(results), results.partial, results.ndmx
+
+
+# ...........................................................................
+# worker start up : build the server's basis before the first request
+# ...........................................................................
+def serve_warm(fields):
+
+    warm(make_config(**fields))
+
+
+# ...........................................................................
+# Server : asyncio front end, searches run on a worker pool
+#
+# jobs > 1 uses a process pool, each worker keeping its own warm basis,
+# otherwise one worker thread.  Results are cached in the server process
+# (in memory, and in an sqlite file if cache_path is given) before any
+# search is handed out.  With an Index every lookup uses it, in the server
+# process, as it takes microseconds.
+# ...........................................................................
+class Server(object):
+
+    def __init__(self, config, jobs=1, cache_path=None, cache_mb=64, index=None):
+
+        self.config = config
+        self.jobs = jobs
+        self.cache_path = cache_path
+        self.max_bytes = int(cache_mb * (1 << 20))
+        self.index = index
+        self.caches = collections.OrderedDict()
+        self.requests = 0
+
+        if jobs > 1:
+            self.executor = concurrent.futures.ProcessPoolExecutor(jobs, initializer=serve_warm, initargs=(dict(config._asdict()),))
+        else:
+            self.executor = concurrent.futures.ThreadPoolExecutor(1)
+            warm(config)
+
+    # .......................................................................
+    # Config of a request : the server's, with the fields given
+    # .......................................................................
+    def request_config(self, settings):
+
+        if not settings:
+            return self.config
+
+        unknown = [k for k in settings if k not in self.config._fields]
+        if unknown:
+            raise ValueError("unknown settings: {}".format(", ".join(sorted(unknown))))
+
+        return self.config._replace(**settings)
+
+    # .......................................................................
+    # result cache for a Config
+    # .......................................................................
+    def cache(self, config):
+
+        found = self.caches.pop(config, None)
+        if found is None:
+            matcher = self.index if self.index is not None else warm(config)
+            found = Cache(matcher, self.cache_path, max_bytes=self.max_bytes)
+        self.caches[config] = found
+
+        while len(self.caches) > MATCHERS:
+            self.caches.popitem(last=False)[1].close()
+
+        return found
+
+    # .......................................................................
+    # reply to one request
+    # .......................................................................
+    async def answer(self, request):
+
+        op = request.get('op', 'match')
+        config = self.request_config(request.get('settings'))
+
+        if op == 'settings':
+            matcher = self.index if self.index is not None else warm(config)
+            return {'settings_short': matcher.settings_short, 'settings_verbose': matcher.settings_verbose}
+
+        if op == 'stats':
+            return {'requests': self.requests,
+                    'caches': dict((c.settings, c.stats()) for c in self.caches.values())}
+
+        if op != 'match':
+            raise ValueError("unknown op: {}".format(op))
+
+        start = time.time()
+        self.requests += 1
+
+        target = float(request['value'])
+        top = request.get('top', 10)
+        budget = request.get('budget')
+
+        # as hpa_batch() : search on the magnitude, restore the sign
+        sign = -1 if target < 0 else 1
+
+        partial = False
+        ndmx = config.ndmx
+
+        cache = self.cache(config)
+        results = cache.lookup(sign * target, top)
+        if results is None:
+            if self.index is not None:
+                results = self.index.match(sign * target, top=top)
+            elif budget is None:
+                loop = asyncio.get_event_loop()
+                results = await loop.run_in_executor(self.executor, serve_search, dict(config._asdict()), sign * target, top)
+            else:
+                loop = asyncio.get_event_loop()
+                results, partial, ndmx = await loop.run_in_executor(
+                    self.executor, serve_search, dict(config._asdict()), sign * target, top, start + float(budget))
+            if not partial:
+                cache.store(sign * target, top, results)
+
+        results = [[r[0], sign * r[1], sign * r[2], sign * r[3], r[4], r[5]] for r in results]
+
+        reply = {'results': results, 'seconds': time.time() - start}
+        if budget is not None:
+            reply['partial'] = partial
+            reply['ndmx'] = ndmx
+
+        return reply
+
+    # .......................................................................
+    # one request line, the reply written under the connection's lock
+    # .......................................................................
+    async def respond(self, line, writer, lock):
+
+        reply = {}
+        try:
+            request = json.loads(line)
+            if 'id' in request:
+                reply['id'] = request['id']
+            reply.update(await self.answer(request))
+        except Exception as e:
+            reply['error'] = "{}: {}".format(type(e).__name__, e)
+
+        async with lock:
+            writer.write(json.dumps(reply).encode('utf-8') + b"\n")
+            await writer.drain()
+
+    # .......................................................................
+    # one connection : every line is answered as its own task
+    # .......................................................................
+    async def connection(self, reader, writer):
+
+        lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self.respond(line.decode('utf-8'), writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    # .......................................................................
+    # listen on a Unix socket path or a localhost port until interrupted
+    # .......................................................................
+    async def listen(self, path=None, port=None, host='127.0.0.1'):
+
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = await asyncio.start_unix_server(self.connection, path)
+            where = path
+        else:
+            server = await asyncio.start_server(self.connection, host, port)
+            where = "{}:{}".format(host, server.sockets[0].getsockname()[1])
+
+        sys.stderr.write("hpa: serving on {}\n".format(where))
+        sys.stderr.flush()
+
+        async with server:
+            await server.serve_forever()
+
+    # .......................................................................
+    def close(self):
+
+        self.executor.shutdown()
+        for c in self.caches.values():
+            c.close()
+
+
+# ...........................................................................
+# run a Server until interrupted
+# ...........................................................................
+def serve(config, path=None, port=None, jobs=1, cache_path=None, cache_mb=64, index=None):
+
+    server = Server(config, jobs, cache_path, cache_mb, index)
+    try:
+        asyncio.run(server.listen(path, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if path is not None and os.path.exists(path):
+            os.unlink(path)
+
+
+# ...........................................................................
+# socket for an address : "PORT", "HOST:PORT" or a Unix socket path
+# ...........................................................................
+def connect(address):
+
+    host, sep, port = address.rpartition(":")
+    if address.isdigit():
+        return socket.create_connection(('127.0.0.1', int(address)))
+    if sep and port.isdigit():
+        return socket.create_connection((host, int(port)))
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+
+# ...........................................................................
+# Client : a matcher (see Matcher) answered by a server
+#
+# Each match() is one request on the connection, searched with the
+# server's basis, cache and workers.  The settings are those the server
+# reports for config, its own where config is None.  Replies carry no
+# equivalent forms, so equivalents() has none.
+# ...........................................................................
+class Client(object):
+
+    def __init__(self, address, config=None):
+
+        self.sock = connect(address)
+        self.file = self.sock.makefile('rwb')
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+        self.settings = None
+        if config is not None:
+            self.settings = dict(config._asdict())
+
+        reply = self.request({'op': 'settings', 'settings': self.settings})
+        self.settings_short = reply['settings_short']
+        self.settings_verbose = reply['settings_verbose']
+
+        # for a Cache in front : the server and the settings it reports (as
+        # settings not given take the server's values) but for the engine
+        self.cache_settings = ['connect', address] + [
+            line for line in self.settings_verbose if not line.startswith("search engine")]
+
+    # .......................................................................
+    # send one request and wait for its reply
+    # .......................................................................
+    def request(self, message):
+
+        with self.lock:
+            self.next_id += 1
+            message = dict(message, id=self.next_id)
+            self.file.write(json.dumps(message).encode('utf-8') + b"\n")
+            self.file.flush()
+
+            line = self.file.readline()
+            if not line:
+                raise IOError("hpa server closed the connection")
+
+        reply = json.loads(line.decode('utf-8'))
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+
+        return reply
+
+    # .......................................................................
+    # as Matcher.match(), jobs and pool are the server's
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        start = time.time()
+        message = {'value': target, 'top': top, 'settings': self.settings}
+        if deadline is not None:
+            message['budget'] = deadline - start
+        reply = self.request(message)
+
+        if stats is not None:
+            stats.phase("search", time.time() - start)
+
+        results = [Approximation.from_row(r) for r in reply['results']]
+        if deadline is None:
+            return results
+
+        results = Results(results)
+        results.partial = reply['partial']
+        results.ndmx = reply['ndmx']
+
+        return results
+
+    # .......................................................................
+    def equivalents(self, result):
+
+        return []
+
+    # .......................................................................
+    def close(self):
+
+        self.file.close()
+        self.sock.close()
+
+# ...........................................................................
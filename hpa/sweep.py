@@ -0,0 +1,442 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# sweep.py (hpa sweep) Deep scans split into shards that checkpoint and resume
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-20 11:00
+#
+# ...........................................................................
+#
+# 2026-10-19 14:00 first version : 'hpa.py sweep init|run|status|merge --sweep DIR'
+# 2026-10-19 22:00 Sweep header says what is particular to it
+# 2026-10-20 11:00 a shard done by the time it is claimed is not run or counted again
+# ...........................................................................
+#
+# The scan of hpa_p() for one multiplier only keeps a numerator if it beats
+# every numerator before it.  A shard, a range of numerators, can not know
+# the best before its start, so it keeps every improvement on the best
+# within the shard (whether in lowest terms or not, as both move the best).
+# Any improvement of the whole scan is one of those, so merge() replays the
+# shards in order against the running best and gets exactly the numerators
+# hpa_p() would, and the ranking of an uninterrupted run.
+#
+# Directory layout :
+#
+#   DIR/sweep.json          target, settings, multipliers and shard ranges
+#   DIR/JOB.json            checkpoint of a shard : next numerator, best, rows
+#   DIR/JOB.lock            held by the worker running the shard
+#
+# Workers on any number of machines can share DIR.  A lock not touched for
+# stale seconds, or held by a process of this machine that is no longer
+# running, is taken to be left by a killed worker and is taken over, the
+# shard resuming from its last checkpoint.
+# ...........................................................................
+
+import errno
+import json
+import math
+import os
+import socket
+import time
+
+try:
+    from .hpa import Approximation, Matcher, gcd, make_config, takeSecond
+except ImportError:
+    from hpa import Approximation, Matcher, gcd, make_config, takeSecond
+
+# numerators scanned between looks at the clock at first, then as many as
+# take about a second
+CHUNK = 1 << 16
+
+
+# ...........................................................................
+# the loop of hpa_p() for numerators n + 1 .. stop, from the best given
+#
+# return the last numerator scanned, the best, and a list of quadruplets
+# [numerator, denominator, error, in lowest terms] for each improvement
+# ...........................................................................
+def sweep_scan(tval, numdenmax, thresh, fixed, n, stop, best):
+
+    rows = []
+
+    # d as hpa_p() leaves it after numerator n
+    if n > 0:
+        d = math.floor((n * fixed) / tval) + 1
+    else:
+        d = 0
+
+    while (max(n,d) < numdenmax) & (best > thresh) & (n < stop):
+        n += 1
+        d = math.floor( (n * fixed)/ tval )
+        try:
+            t = ((n * fixed)/ d) - tval
+        except:
+            t = float("inf")
+
+        if abs(t) < best:
+            best = abs(t)
+            rows.append((n, d, t, gcd(n, d) < 2))
+
+        d += 1
+
+        t = ((n * fixed) / d) - tval
+        if abs(t) < best:
+            best = abs(t)
+            rows.append((n, d, t, gcd(n, d) < 2))
+
+    return n, best, rows
+
+
+# ...........................................................................
+# the numerators of one multiplier hpa_p() may reach : n or d reaches the
+# limit first
+# ...........................................................................
+def sweep_numerators(tval, numdenmax, fixed):
+
+    return int(min(numdenmax, math.ceil(numdenmax * tval / fixed))) + 1
+
+
+# ...........................................................................
+# set up a sweep of target in DIR : each multiplier of the Matcher (or those
+# whose text is in only) split into shards ranges of numerators
+# ...........................................................................
+def init(path, target, matcher, shards=16, only=None):
+
+    if not os.path.isdir(path):
+        os.makedirs(path)
+
+    if os.path.exists(os.path.join(path, "sweep.json")):
+        raise ValueError("a sweep is already set up in {}".format(path))
+
+    config = matcher.config
+
+    jobs = []
+    multipliers = []
+    for i, (f, text, form) in enumerate(matcher.basis):
+        if only and text not in only and text.replace("* ", "", 1) not in only:
+            continue
+        multipliers.append([i, text, f])
+
+        count = sweep_numerators(target, config.ndmx, f)
+        size = -(-count // shards)
+        for k in range(shards):
+            start = k * size
+            if start >= count:
+                break
+            jobs.append({'name': "m{:04d}-s{:05d}".format(i, k), 'multiplier': i,
+                         'start': start, 'stop': min(count, start + size)})
+
+    if not jobs:
+        raise ValueError("no multipliers to sweep")
+
+    sweep = {
+        'target': target,
+        'config': dict(config._asdict()),
+        'multipliers': multipliers,
+        'jobs': jobs,
+    }
+
+    write(os.path.join(path, "sweep.json"), sweep)
+
+    return sweep
+
+
+# ...........................................................................
+def load(path):
+
+    with open(os.path.join(path, "sweep.json")) as f:
+        return json.load(f)
+
+
+# ...........................................................................
+# checkpoint of a job, or None if it has not started
+# ...........................................................................
+def checkpoint(path, job):
+
+    try:
+        with open(os.path.join(path, job['name'] + ".json")) as f:
+            return json.load(f)
+    except (IOError, OSError):
+        return None
+
+
+# ...........................................................................
+# write JSON so a reader never sees half a file
+# ...........................................................................
+def write(name, data):
+
+    temp = "{}.{}.{}.tmp".format(name, socket.gethostname(), os.getpid())
+    with open(temp, "w") as f:
+        json.dump(data, f)
+    os.rename(temp, name)
+
+
+# ...........................................................................
+# True if a lock was left by a worker of this machine that has ended
+# ...........................................................................
+def orphan(lock):
+
+    try:
+        with open(lock) as f:
+            host, pid = f.read().split()
+        if host != socket.gethostname():
+            return False
+        os.kill(int(pid), 0)
+    except ValueError:
+        return False
+    except OSError as e:
+        # no such process, as against no permission to signal it
+        return e.errno == errno.ESRCH
+
+    return False
+
+
+# ...........................................................................
+# take the lock of a job, taking over one left stale by a killed worker
+# ...........................................................................
+def claim(path, job, stale):
+
+    lock = os.path.join(path, job['name'] + ".lock")
+
+    try:
+        if time.time() - os.path.getmtime(lock) > stale or orphan(lock):
+            # only one worker wins the rename
+            os.rename(lock, "{}.{}.{}.stale".format(lock, socket.gethostname(), os.getpid()))
+            os.remove("{}.{}.{}.stale".format(lock, socket.gethostname(), os.getpid()))
+    except OSError:
+        pass
+
+    try:
+        fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except OSError:
+        return False
+
+    os.write(fd, "{} {}\n".format(socket.gethostname(), os.getpid()).encode("utf-8"))
+    os.close(fd)
+
+    return True
+
+
+# ...........................................................................
+# run one job from its checkpoint, writing a checkpoint every interval
+# seconds and when done
+# ...........................................................................
+def run_job(path, sweep, job, interval=60.0):
+
+    config = sweep['config']
+    fixed = [m[2] for m in sweep['multipliers'] if m[0] == job['multiplier']][0]
+    lock = os.path.join(path, job['name'] + ".lock")
+
+    state = checkpoint(path, job)
+    if state is None:
+        state = {'n': job['start'], 'best': 1e6, 'rows': [], 'done': False, 'seconds': 0.0}
+
+    chunk = CHUNK
+    last = time.time()
+    while not state['done']:
+        start = time.time()
+        stop = min(job['stop'], state['n'] + chunk)
+        n, best, rows = sweep_scan(sweep['target'], config['ndmx'], config['thr'], fixed, state['n'], stop, state['best'])
+        seconds = time.time() - start
+        chunk = max(1024, min(8 * chunk, int(chunk / max(seconds, 1e-3))))
+
+        # the limit or threshold ended the scan before stop, or the shard is done
+        state['rows'].extend(rows)
+        state['done'] = n < stop or n >= job['stop']
+        state['n'] = n
+        state['best'] = best
+        state['seconds'] += seconds
+
+        if state['done'] or time.time() - last >= interval:
+            write(os.path.join(path, job['name'] + ".json"), state)
+            # a touched lock is not stale
+            os.utime(lock, None)
+            last = time.time()
+
+    return state
+
+
+# ...........................................................................
+# worker : run jobs of DIR until none is left to claim, return the count run
+# ...........................................................................
+def work(path, interval=60.0, stale=None):
+
+    if stale is None:
+        stale = max(3 * interval, 60.0)
+
+    sweep = load(path)
+
+    count = 0
+    for job in sweep['jobs']:
+        state = checkpoint(path, job)
+        if state is not None and state['done']:
+            continue
+        if not claim(path, job, stale):
+            continue
+        try:
+            # another worker may have finished it and let go of the lock
+            # between the look above and the claim
+            state = checkpoint(path, job)
+            if state is not None and state['done']:
+                continue
+            run_job(path, sweep, job, interval)
+            count += 1
+        finally:
+            os.remove(os.path.join(path, job['name'] + ".lock"))
+
+    return count
+
+
+# ...........................................................................
+# worker for a process pool
+# ...........................................................................
+def work_args(args):
+
+    return work(*args)
+
+
+# ...........................................................................
+# run the jobs of DIR with jobs worker processes
+# ...........................................................................
+def run(path, jobs=1, interval=60.0, stale=None):
+
+    if jobs <= 1:
+        return work(path, interval, stale)
+
+    import multiprocessing
+    pool = multiprocessing.Pool(jobs)
+    try:
+        return sum(pool.map(work_args, [(path, interval, stale)] * jobs))
+    finally:
+        pool.close()
+        pool.join()
+
+
+# ...........................................................................
+# progress : [done, running, waiting, numerators scanned, numerators]
+# ...........................................................................
+def status(path):
+
+    sweep = load(path)
+
+    done = running = waiting = 0
+    scanned = total = 0
+    for job in sweep['jobs']:
+        state = checkpoint(path, job)
+        total += job['stop'] - job['start']
+        if state is not None:
+            scanned += state['n'] - job['start']
+        if state is not None and state['done']:
+            done += 1
+            scanned += job['stop'] - state['n']
+        elif os.path.exists(os.path.join(path, job['name'] + ".lock")):
+            running += 1
+        else:
+            waiting += 1
+
+    return done, running, waiting, scanned, total
+
+
+# ...........................................................................
+# Sweep : the merged results of a finished sweep
+#
+# A matcher (see Matcher) for one target only, the one the sweep was set up
+# for : match() merges the shard checkpoints rather than searching, so
+# hpa_report() prints a sweep as it does a search.
+# ...........................................................................
+class Sweep(object):
+
+    def __init__(self, path):
+
+        self.path = path
+        self.sweep = load(path)
+        self.config = make_config(**self.sweep['config'])
+        self.target = self.sweep['target']
+
+        matcher = Matcher(self.config)
+        self.settings_short = matcher.settings_short + " sweep"
+        self.settings_verbose = matcher.settings_verbose + ["{:<35} : {}".format("sweep", path)]
+
+    # .......................................................................
+    # hpa_p() results of each multiplier from the shard checkpoints
+    # .......................................................................
+    def merge(self):
+
+        thresh = self.config.thr
+        jobs = {}
+        for job in self.sweep['jobs']:
+            jobs.setdefault(job['multiplier'], []).append(job)
+
+        found = []
+        for i, text, fixed in self.sweep['multipliers']:
+            best = 1e6
+            last = None
+            rows = []
+            for job in sorted(jobs[i], key=lambda job: job['start']):
+                state = checkpoint(self.path, job)
+                if state is None or not state['done']:
+                    raise ValueError("sweep shard {} has not finished".format(job['name']))
+                for n, d, t, reduced in state['rows']:
+                    # hpa_p() ends after the numerator that reached the threshold
+                    if last is not None and n > last:
+                        break
+                    if abs(t) < best:
+                        best = abs(t)
+                        if reduced:
+                            rows.append((n, d, t))
+                        if best <= thresh:
+                            last = n
+                if last is not None:
+                    break
+            found.append((fixed, text, rows))
+
+        return found
+
+    # .......................................................................
+    # as Matcher.match() for the sweep's target
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        if target != self.target:
+            raise ValueError("the sweep in {} is of {}".format(self.path, self.target))
+
+        start = time.time()
+
+        results = []
+        for fixed, text, rows in self.merge():
+            for nb, db, t in rows:
+                results.append(Approximation(nb, db, text, t, (nb * fixed) / db))
+
+        results.sort(key=takeSecond)
+
+        if stats is not None:
+            stats.phase("merge", time.time() - start)
+
+        if top is not None:
+            results = results[:top]
+
+        return results
+
+    # .......................................................................
+    def equivalents(self, result):
+
+        return []
+
+# ...........................................................................
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# transforms.py (hpa transforms) Match functions of the value, as x^2 or ln x
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-19 22:00
+#
+# ...........................................................................
+#
+# 2026-10-19 17:00 first version : 'hpa.py --transforms sq,cube,recip,ln,exp'
+# 2026-10-19 22:00 Transforms header says what is particular to it
+# ...........................................................................
+#
+# sqrt((3/7) * Pi) is not p/q * c, but its square is.  Each transform is
+# applied to the value and the result searched with the one basis (and
+# cache and worker pool), each approximation y of the transformed value is
+# taken back through the inverse to an approximation of the value, and all
+# are ranked together by their error in the value.
+#
+# A transformed value that is negative (ln x for x < 1) is searched as its
+# magnitude, as hpa_report() does with the value.  1 / (p/q) is the ratio
+# q/p the value's own search finds, so recip leaves out ratios, and all of
+# it when the basis has reciprocals (-r).
+# ...........................................................................
+
+import math
+import time
+
+try:
+    from .hpa import Approximation, Results, Stats, takeSecond
+except ImportError:
+    from hpa import Approximation, Results, Stats, takeSecond
+
+
+# ...........................................................................
+# transforms : [name, of the value, inverse, text of the approximation]
+# ...........................................................................
+TRANSFORMS = (
+    ('sq',    lambda x: x * x,       math.sqrt,                 "sqrt({})"),
+    ('cube',  lambda x: x * x * x,   lambda y: y ** (1.0 / 3),  "cbrt({})"),
+    ('recip', lambda x: 1.0 / x,     lambda y: 1.0 / y,         "1 / ({})"),
+    ('ln',    math.log,              math.exp,                  "exp({})"),
+    ('exp',   math.exp,              math.log,                  "ln({})"),
+)
+
+NAMES = [t[0] for t in TRANSFORMS]
+
+
+# ...........................................................................
+# Transformed : an approximation of the value from one of a transformed
+# value, p / q * multiplier being the approximation of the transformed value
+#
+#   transform   name in TRANSFORMS
+#   sign        -1 if the transformed value was negative, else 1
+#   error       value - target, in the value
+#   value       the inverse of sign * (p * multiplier) / q
+# ...........................................................................
+class Transformed(Approximation):
+
+    __slots__ = ('transform', 'sign')
+
+    def __init__(self, p, q, basis, error, value, transform, sign=1):
+
+        Approximation.__init__(self, p, q, basis, error, value)
+        self.transform = transform
+        self.sign = sign
+
+    # .......................................................................
+    @property
+    def text(self):
+
+        inner = Approximation.text.fget(self)
+        if self.sign < 0:
+            inner = "-" + inner
+
+        return dict((t[0], t[3]) for t in TRANSFORMS)[self.transform].format(inner)
+
+    # .......................................................................
+    def __repr__(self):
+
+        return "Transformed(p={!r}, q={!r}, basis={!r}, error={!r}, value={!r}, transform={!r}, sign={!r})".format(
+            self.p, self.q, self.basis, self.error, self.value, self.transform, self.sign)
+
+
+# ...........................................................................
+# Transforms : a matcher's results for the value and for transforms of it
+#
+# Wraps any matcher (see Matcher) : a Matcher, or a Cache, Index or Client
+# in front of one, each transformed value being one more match() of it.
+# Its own settings add the transforms, and equivalents() takes those of
+# the inner matcher back through the transform.
+# ...........................................................................
+class Transforms(object):
+
+    def __init__(self, matcher, names=None):
+
+        if names is None:
+            names = NAMES
+
+        for name in names:
+            if name not in NAMES:
+                raise ValueError("unknown transform {}, not one of {}".format(name, ", ".join(NAMES)))
+
+        self.matcher = matcher
+        self.transforms = [t for t in TRANSFORMS if t[0] in names]
+
+        # the Config of the matcher, or of the matcher a Cache is in front of
+        inner = matcher
+        while getattr(inner, 'config', None) is None and hasattr(inner, 'matcher'):
+            inner = inner.matcher
+        if getattr(getattr(inner, 'config', None), 'enable_recip', False):
+            self.transforms = [t for t in self.transforms if t[0] != 'recip']
+
+        listed = ",".join(t[0] for t in self.transforms)
+        self.settings_short = "{} transforms {}".format(matcher.settings_short, listed)
+        self.settings_verbose = matcher.settings_verbose + ["{:<35} : {}".format("transforms", listed)]
+
+    # .......................................................................
+    # targets to search : [name, transformed value, sign], the value first
+    # (name None), leaving out transforms that overflow or give 0
+    # .......................................................................
+    def targets(self, target):
+
+        found = [(None, target, 1)]
+        for name, forward, inverse, text in self.transforms:
+            try:
+                value = forward(target)
+            except (ArithmeticError, ValueError):
+                continue
+            if value == 0 or math.isinf(value) or math.isnan(value):
+                continue
+            found.append((name, abs(value), -1 if value < 0 else 1))
+
+        return found
+
+    # .......................................................................
+    # as Matcher.match() : the top of every search, ranked by error in the
+    # value
+    #
+    # With a worker pool (jobs > 1 or pool given) the searches are made at
+    # once from threads, so the workers are shared by all of them.  A
+    # deadline is shared out between the searches in turn.
+    # .......................................................................
+    def match(self, target, jobs=1, pool=None, top=None, stats=None, deadline=None):
+
+        targets = self.targets(target)
+
+        own = None
+        if pool is None and jobs > 1 and deadline is None:
+            import multiprocessing
+            pool = own = multiprocessing.Pool(jobs)
+
+        try:
+            if pool is not None and deadline is None:
+                found = self.match_threads(targets, jobs, pool, top, stats)
+            else:
+                found = []
+                for k, (name, value, sign) in enumerate(targets):
+                    if deadline is None:
+                        found.append(self.matcher.match(value, jobs, pool, top, stats))
+                    else:
+                        share = (deadline - time.time()) / (len(targets) - k)
+                        found.append(self.matcher.match(value, jobs, pool, top, stats, time.time() + share))
+        finally:
+            if own is not None:
+                own.close()
+                own.join()
+
+        inverses = dict((t[0], t[2]) for t in self.transforms)
+
+        results = []
+        for (name, value, sign), rows in zip(targets, found):
+            if name is None:
+                results.extend(rows)
+                continue
+            for r in rows:
+                if name == 'recip' and r[5] == "ratio":
+                    continue
+                try:
+                    back = inverses[name](sign * r[2])
+                except (ArithmeticError, ValueError):
+                    continue
+                results.append(Transformed(r[3], r[4], r[5], back - target, back, name, sign))
+
+        results.sort(key=takeSecond)
+
+        if top is not None:
+            results = results[:top]
+
+        if deadline is not None:
+            partial = [r for r in found if getattr(r, 'partial', False)]
+            results = Results(results)
+            results.partial = bool(partial)
+            results.ndmx = min([getattr(r, 'ndmx', None) for r in found if getattr(r, 'ndmx', None) is not None] or [None])
+
+        return results
+
+    # .......................................................................
+    # the searches of match() run together from threads, each with its own
+    # Stats added to stats when done
+    # .......................................................................
+    def match_threads(self, targets, jobs, pool, top, stats):
+
+        import threading
+
+        found = [None] * len(targets)
+        counted = [Stats() if stats is not None else None for t in targets]
+
+        def search(k):
+            found[k] = self.matcher.match(targets[k][1], max(jobs, 1), pool, top, counted[k])
+
+        threads = [threading.Thread(target=search, args=(k,)) for k in range(len(targets))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for k, own in enumerate(counted):
+            if found[k] is None:
+                raise RuntimeError("search of {} failed".format(targets[k][0] or "the value"))
+            if own is not None:
+                for name, seconds in own.phases.items():
+                    stats.phase(name, seconds)
+                for text, counts in own.constants.items():
+                    stats.add(text, counts)
+
+        return found
+
+    # .......................................................................
+    # equivalents of the matcher, through the same transform
+    # .......................................................................
+    def equivalents(self, result):
+
+        transform = getattr(result, 'transform', None)
+        if transform is None:
+            return self.matcher.equivalents(result)
+
+        same = []
+        for e in self.matcher.equivalents(Approximation(result.p, result.q, result.basis, result.error, result.value)):
+            same.append(Transformed(e[3], e[4], e[5], result.error, result.value, transform, result.sign))
+
+        return same
+
+# ...........................................................................
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# ...........................................................................
+#
+# watch.py (hpa watch) Follow a value as it is refined, reporting top changes
+#
+# Copyright (C) 2022  John Taylor
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# ...........................................................................
+#
+# 2026-10-20 12:00
+#
+# ...........................................................................
+#
+# 2026-10-19 16:00 first version : 'hpa.py --watch' and Watch
+# 2026-10-20 12:00 results that move within the top are reported
+# ...........................................................................
+#
+# An optimiser converging on a value gives a stream of values each a little
+# nearer the last.  Each multiplier keeps, from the last value it was
+# searched for, the smallest error of its scan and how the scan ended : the
+# last numerator the limit let it reach, or the ratio that reached the
+# threshold.  Every candidate of the scan for a new value is a candidate
+# (or no better than one) for the old value, as long as it reaches no
+# further numerator, so its error is no less than the old smallest less
+# the distance between the values.  The scan reaches no further while the
+# limit allows no more numerators, or the ratio that ended it is still
+# within the threshold.  A multiplier whose old smallest, less that
+# distance, can not beat the top found so far is left out without a
+# search, so once the value settles few multipliers are searched.
+#
+# Multipliers that are searched use the continued fraction engine, which
+# finds the same improvements as the scan, so the results of every update
+# are those of Matcher.match() for the value.
+# ...........................................................................
+
+import math
+import sys
+
+try:
+    from .hpa import Approximation, Stats, TopK, hpa_p_cf, takeSecond, timer
+except ImportError:
+    from hpa import Approximation, Stats, TopK, hpa_p_cf, takeSecond, timer
+
+
+# ...........................................................................
+# last numerator the scan of hpa_p() reaches for tval, as reached() of
+# hpa_p_cf() : numerator m is scanned if m - 1 left max(n,d) below the limit
+# ...........................................................................
+def watch_reach(tval, numdenmax, fixed):
+
+    def reached(m):
+        if m < 2:
+            return True
+        return max(m - 1, math.floor(((m - 1) * fixed) / tval) + 1) < numdenmax
+
+    last = int(min(numdenmax, math.ceil((numdenmax - 1) * tval / fixed)))
+    while reached(last + 1):
+        last += 1
+    while last > 1 and not reached(last):
+        last -= 1
+
+    return last
+
+
+# ...........................................................................
+# Watch : the top results of a Matcher for a value refined over time
+#
+#   watch = Watch(Matcher(config), top=10)
+#   for value in values:
+#       results, entered, left, moved = watch.update(value)
+#
+# update() returns the sorted top results, as Matcher.match(abs(value),
+# top=top), those that were not in the top before, those no longer in it
+# and those still in it at another rank.  searched and skipped count the multipliers of the last update.  With
+# top None every result is kept and every multiplier searched.
+# ...........................................................................
+class Watch(object):
+
+    def __init__(self, matcher, top=10, stats=None):
+
+        self.matcher = matcher
+        self.top = top
+        self.stats = stats
+        self.results = []
+        self.searched = 0
+        self.skipped = 0
+
+        # by basis index : [value, smallest error, last numerator reached,
+        # [numerator, denominator] that reached the threshold or None]
+        self.state = {}
+
+    # .......................................................................
+    # smallest error multiplier i can have for tval, from its state
+    # .......................................................................
+    def least(self, i, tval):
+
+        if i not in self.state:
+            return float("-inf")
+
+        config = self.matcher.config
+        fixed = self.matcher.basis[i][0]
+        value, best, last, ended = self.state[i]
+
+        # rounding of errors taken from each value
+        eps = 4e-16 * max(tval, value)
+
+        # a scan that may reach further is searched
+        if ended is not None:
+            n, d = ended
+            if abs(((n * fixed) / d) - tval) > config.thr - eps:
+                return float("-inf")
+        elif watch_reach(tval, config.ndmx, fixed) > last:
+            return float("-inf")
+
+        return best - abs(tval - value) - eps
+
+    # .......................................................................
+    # the top results for the new value, and the changes to the top
+    # .......................................................................
+    def update(self, target):
+
+        tval = abs(target)
+        config = self.matcher.config
+        basis = self.matcher.basis
+        stats = self.stats
+
+        start = timer()
+
+        least = [self.least(i, tval) for i in range(len(basis))]
+
+        # the most promising first so the bound falls quickly
+        kept = TopK(self.top)
+        counts = {}
+        every = {}
+        searched = skipped = 0
+        for i in sorted(range(len(basis)), key=lambda i: least[i]):
+            f, fp, form = basis[i]
+
+            c = counts[i] = Stats.counts()
+
+            if least[i] > kept.bound():
+                skipped += 1
+                c['skipped'] = 1
+                continue
+
+            begin = timer()
+            rows = hpa_p_cf(tval, config.ndmx, config.thr, f, counts=c)
+            c['seconds'] = timer() - begin
+            searched += 1
+
+            # an improvement not in lowest terms may hold the smallest error
+            best = float("inf")
+            ended = None
+            if rows:
+                best = abs(rows[-1][2])
+                if best <= config.thr:
+                    ended = rows[-1][:2]
+            if c['gcd_rejected']:
+                best = float("-inf")
+            self.state[i] = (tval, best, watch_reach(tval, config.ndmx, f), ended)
+
+            if self.top is None:
+                every[i] = rows
+            else:
+                kept.extend(i, rows)
+
+        if self.top is None:
+            found = [every[i] for i in range(len(basis))]
+        else:
+            found = kept.found(range(len(basis)))
+
+        results = []
+        for i, ((f, fp, form), rows) in enumerate(zip(basis, found)):
+            for nb, db, t in rows:
+                results.append(Approximation(nb, db, fp, t, (nb * f) / db))
+            if stats is not None:
+                counts[i]['kept'] = len(rows)
+                stats.add(fp, counts[i])
+
+        results.sort(key=takeSecond)
+
+        # ranks by (p, q, basis), the error changing with the value
+        before = dict(((r.p, r.q, r.basis), k) for k, r in enumerate(self.results))
+        after = dict(((r.p, r.q, r.basis), k) for k, r in enumerate(results))
+        entered = [r for r in results if (r.p, r.q, r.basis) not in before]
+        left = [r for r in self.results if (r.p, r.q, r.basis) not in after]
+        moved = [r for k, r in enumerate(results) if before.get((r.p, r.q, r.basis), k) != k]
+
+        self.results = results
+        self.searched = searched
+        self.skipped = skipped
+
+        if stats is not None:
+            stats.phase("watch", timer() - start)
+
+        return results, entered, left, moved
+
+
+# ...........................................................................
+# --watch : read values from lines of source (stdin for "-") and print the
+# changes to the top as each arrives : + and the rank for those that come
+# in, = and the new rank for those that move, - for those that drop out
+#
+# blank lines and lines starting with # are skipped, as in batch mode
+# ...........................................................................
+def watch(source, matcher, top=10, stats=None, out=None):
+
+    if out is None:
+        out = sys.stdout
+
+    if source == "-":
+        lines = sys.stdin
+    else:
+        lines = open(source)
+
+    follow = Watch(matcher, top, stats)
+    sign = " "
+
+    try:
+        # readline() rather than iteration so each value is taken as it comes
+        line_no = 0
+        for line in iter(lines.readline, ""):
+            line_no += 1
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            try:
+                target = float(line)
+            except ValueError:
+                sys.stderr.write("hpa: line {}: not a value: {}\n".format(line_no, line))
+                continue
+
+            results, entered, left, moved = follow.update(target)
+
+            # those that left were of the value before
+            was = sign
+            sign = "-" if target < 0 else " "
+
+            out.write("\n {} : {} in, {} out, {} moved, {} of {} multipliers searched\n".format(
+                target, len(entered), len(left), len(moved), follow.searched, follow.searched + follow.skipped))
+
+            for mark, changed in (("+", entered), ("=", moved)):
+                for s in changed:
+                    errsign = "-" if s[1] < 0 else " "
+                    out.write("{}{:>3} {}{:<35}{}{:.15f}\t{:.15f}\n".format(
+                        mark, results.index(s) + 1, sign, s[0], errsign, abs(s[1]), s[2]))
+            for s in left:
+                out.write("-    {}{}\n".format(was, s[0]))
+
+            out.flush()
+    finally:
+        if lines is not sys.stdin:
+            lines.close()
+
+    return follow.results
+
+# ...........................................................................
@@ -0,0 +1,154 @@
+# ...........................................................................
+#
+# test_hpa.py : hpa.py functions
+#
+# ...........................................................................
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hpa.hpa import Matcher, make_config, whole
+
+HPA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpa", "hpa.py")
+
+
+# ...........................................................................
+def hpa(args, text=None):
+
+    return subprocess.run([sys.executable, HPA] + list(args), input=text, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True, timeout=120)
+
+
+# ...........................................................................
+class TestWhole(unittest.TestCase):
+
+    def test_whole(self):
+
+        self.assertEqual(whole("1000"), 1000)
+        self.assertEqual(whole("1e9"), 1000000000)
+        self.assertEqual(whole("2.0"), 2)
+        self.assertEqual(whole("123456789012345678901"), 123456789012345678901)
+
+    def test_not_whole(self):
+
+        for text in ("1.5", "1e-3", "inf", "nan", "abc"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                whole(text)
+
+
+# ...........................................................................
+# --time-budget : the search ends near the deadline whatever the engine
+# ...........................................................................
+class TestBudget(unittest.TestCase):
+
+    def budget(self, engine, seconds):
+
+        matcher = Matcher(make_config(sm=1000, cm=1000, ndmx=10 ** 9, engine=engine))
+        start = time.time()
+        results = matcher.match(3.141592653589793, top=10, deadline=start + seconds)
+
+        return results, time.time() - start
+
+    def test_budget(self):
+
+        for engine in ('scan', 'cf', 'numpy'):
+            if engine == 'numpy':
+                try:
+                    import numpy
+                except ImportError:
+                    continue
+
+            for seconds in (0.02, 0.2):
+                results, spent = self.budget(engine, seconds)
+                self.assertTrue(results.partial)
+                self.assertLess(spent, seconds + 0.1, engine)
+
+            # most of a longer budget is used
+            results, spent = self.budget(engine, 0.5)
+            self.assertGreater(spent, 0.25, engine)
+            self.assertGreaterEqual(results.ndmx, 100, engine)
+
+
+# ...........................................................................
+# every engine gives the results of the scan
+# ...........................................................................
+class TestEngines(unittest.TestCase):
+
+    def test_small_values(self):
+
+        engines = ['scan', 'cf']
+        try:
+            import numpy
+            engines.append('numpy')
+        except ImportError:
+            pass
+
+        for target in (1e-25, 1e-16, 1e-12, 0.5, 3.141592653589793):
+            found = [Matcher(make_config(engine=engine)).match(target, top=10) for engine in engines]
+            for engine, results in zip(engines[1:], found[1:]):
+                self.assertEqual([tuple(r) for r in results], [tuple(r) for r in found[0]], (engine, target))
+
+
+# ...........................................................................
+# --watch : results that move within the top are reported
+# ...........................................................................
+class TestWatch(unittest.TestCase):
+
+    def test_moved(self):
+
+        from hpa.watch import Watch
+
+        watch = Watch(Matcher(make_config()), top=3)
+        results, entered, left, moved = watch.update(0.917795)
+        self.assertEqual(len(entered), 3)
+        self.assertEqual(moved, [])
+
+        results, entered, left, moved = watch.update(0.9177951811)
+        self.assertEqual((entered, left), ([], []))
+        self.assertEqual(results[0].text, "(7 / 11)  * cbrt(3)")
+        self.assertIn(results[0], moved)
+
+        run = hpa(["--watch", "-", "-x", "3"], "0.917795\n0.9177951811\n")
+        self.assertIn("0 in, 0 out, 2 moved", run.stdout)
+        self.assertIn("=  1  (7 / 11)  * cbrt(3)", run.stdout)
+
+
+# ...........................................................................
+# -B : a line that can not be answered is reported and the rest go on
+# ...........................................................................
+class TestBatch(unittest.TestCase):
+
+    def test_tolerance_through_cache(self):
+
+        run = hpa(["-B", "-", "-k", "-", "-x", "1"], "0.5\n0.9177951+-2e-7\n0.25\n")
+
+        targets = [json.loads(line)["target"] for line in run.stdout.splitlines()]
+        self.assertEqual(targets, [0.5, 0.25])
+        self.assertIn("hpa: line 2:", run.stderr)
+
+    # .......................................................................
+    # errors are reported with a non-zero exit status
+    # .......................................................................
+    def test_errors(self):
+
+        missing = os.path.join(os.path.dirname(os.path.abspath(__file__)), "no such file")
+
+        for args in (["-B", missing], ["-I", missing, "0.5"], ["--connect", missing, "0.5"],
+                     ["sweep", "merge", "--sweep", missing]):
+            run = hpa(args)
+            self.assertNotEqual(run.returncode, 0, args)
+            self.assertIn("hpa: ", run.stderr, args)
+
+        run = hpa(["-n", "1.5", "0.5"])
+        self.assertEqual(run.returncode, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
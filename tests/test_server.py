@@ -0,0 +1,75 @@
+# ...........................................................................
+#
+# test_server.py : 'hpa.py serve' and 'hpa.py --connect ADDR'
+#
+# ...........................................................................
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+HPA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hpa", "hpa.py")
+
+
+# ...........................................................................
+def hpa(*args):
+
+    return subprocess.run([sys.executable, HPA] + list(args), stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True, timeout=120)
+
+
+# ...........................................................................
+# a server on a Unix socket for the tests of the class
+# ...........................................................................
+class TestConnect(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        cls.dir = tempfile.TemporaryDirectory()
+        cls.sock = os.path.join(cls.dir.name, "hpa.sock")
+        cls.server = subprocess.Popen([sys.executable, HPA, "serve", "--socket", cls.sock],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        waited = 0
+        while not os.path.exists(cls.sock) and waited < 60:
+            time.sleep(0.1)
+            waited += 0.1
+
+    @classmethod
+    def tearDownClass(cls):
+
+        cls.server.terminate()
+        cls.server.wait()
+        cls.dir.cleanup()
+
+    # .......................................................................
+    def test_connect(self):
+
+        run = hpa("--connect", self.sock, "0.917795181104714")
+
+        self.assertEqual(run.returncode, 0, run.stderr)
+        self.assertIn("(7 / 11)  * cbrt(3)", run.stdout)
+
+    # .......................................................................
+    # a Cache in front of a Client, the second run answered from the file
+    # .......................................................................
+    def test_connect_cache(self):
+
+        cache = os.path.join(self.dir.name, "cache.db")
+        direct = hpa("0.917795181104714")
+
+        for k in range(2):
+            run = hpa("--connect", self.sock, "-k", cache, "0.917795181104714")
+            self.assertEqual(run.returncode, 0, run.stderr)
+            self.assertIn("(7 / 11)  * cbrt(3)", run.stdout)
+            self.assertEqual(run.stdout.split("approximation")[1], direct.stdout.split("approximation")[1])
+
+        self.assertTrue(os.path.getsize(cache) > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
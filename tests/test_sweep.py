@@ -0,0 +1,69 @@
+# ...........................................................................
+#
+# test_sweep.py : sharded sweeps (sweep.py)
+#
+# ...........................................................................
+
+import os
+import sys
+import tempfile
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hpa import sweep
+from hpa.hpa import Matcher, make_config
+
+
+# ...........................................................................
+class TestWork(unittest.TestCase):
+
+    def setUp(self):
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "sweep")
+        self.matcher = Matcher(make_config(ndmx=20000))
+        sweep.init(self.path, 3.141592653589793, self.matcher, 3)
+
+    def tearDown(self):
+
+        self.dir.cleanup()
+
+    # .......................................................................
+    def test_merge(self):
+
+        self.assertEqual(sweep.run(self.path), len(sweep.load(self.path)['jobs']))
+
+        merged = sweep.Sweep(self.path).match(3.141592653589793, top=10)
+        self.assertEqual([tuple(r) for r in merged], [tuple(r) for r in self.matcher.match(3.141592653589793, top=10)])
+
+    # .......................................................................
+    # a shard another worker finished after it was looked at is claimed,
+    # seen to be done and left, not counted
+    # .......................................................................
+    def test_finished_before_claim(self):
+
+        sweep.work(self.path)
+
+        looked = set()
+        checkpoint = sweep.checkpoint
+
+        def before_claim(path, job):
+            if job['name'] not in looked:
+                looked.add(job['name'])
+                return None
+            return checkpoint(path, job)
+
+        with mock.patch.object(sweep, 'checkpoint', before_claim):
+            self.assertEqual(sweep.work(self.path), 0)
+
+        self.assertFalse([name for name in os.listdir(self.path) if name.endswith(".lock")])
+
+
+if __name__ == '__main__':
+    unittest.main()